@@ -0,0 +1,35 @@
+// Function values: lambdas with their closures, declared functions named
+// without parentheses, and module functions. Each check throws on a wrong
+// result.
+import "lib/check.el"
+import "lib/stats.el"
+
+// Closures keep the variables of the scope that created them
+fn make_counter(start: int) {
+    arg step = 10
+    return lambda(n: int) { return start + step * n }
+}
+arg from5 = make_counter(5)
+arg from0 = make_counter(0)
+check.expect("closure", from5(2), 25)  // 25
+check.expect("separate scopes", from0(2), 20)  // 20
+arg ops: array = [from5, lambda(v: int) { return v * v }]
+check.expect("stored functions", map(ops[1], [2, 3]), [4, 9])  // [4, 9]
+check.expect("called from array", ops[0](1), 15)  // 15
+arg offset: int = 1
+arg shift = lambda(v: int) { return v + offset }
+offset = 2
+check.expect("sees later changes", shift(1), 3)  // 3
+
+
+// Declared functions are values too
+fn halve(x: int) float { return x / 2 }
+arg h = halve
+check.expect("named function", h(5), 2.5)  // 2.5
+check.expect("filter by value", filter(lambda(v: int) { return v > 1 }, [1, 2, 3]), [2, 3])  // [2, 3]
+
+// Module functions are values and run in their module
+check.expect("map", map(stats.triple, [1, 2]), [3, 6])  // [3, 6]
+check.expect("map namespace", map(stats.scaled, [1, 2]), [10, 20])  // [10, 20]
+arg t = stats.triple
+check.expect("stored", t(5), 15)  // 15
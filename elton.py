@@ -1,34 +1,127 @@
 #!/usr/bin/env python3
 import sys
+import time
+import argparse
 from src import Lexer, Parser, Interpreter
+from src.io_builtins import with_io
+from src.modules import MODULE_CACHE
+from src.optimizer import inline_functions
+from src.snapshot import run_with_snapshot
+from src.batch import collect_scripts, run_batch, format_summary
 
-def main():
-    if len(sys.argv) != 2:
-        print("Usage: python elton.py <source_file>")
-        sys.exit(1)
-        
+def run_file(path, engine='tree', dump_py=False, cache_dir=None, memory_report=False, memory_threshold=None,
+             snapshot=None):
     try:
-        with open(sys.argv[1], 'r') as f:
+        with open(path, 'r') as f:
             source = f.read()
-            
+
+        # Scripts run from the command line may use the file and stdin builtins
+        builtins = with_io()
+        if engine == 'py' or dump_py:
+            return run_compiled(path, source, dump_py, cache_dir, builtins)
+
         # Create lexer and generate tokens
         lexer = Lexer(source)
         tokens = lexer.tokenize()
-        
+
         # Parse tokens into AST
         parser = Parser(tokens)
         ast = parser.parse()
-        
+
+        if memory_report:
+            # Not inlined, so allocations are charged to the helper that made them
+            from src.memory import run_with_memory_report
+            run_with_memory_report(ast, path, memory_threshold, builtins=builtins)
+            return
+        ast = inline_functions(ast, builtins)
+
         # Execute the AST
-        interpreter = Interpreter()
-        interpreter.evaluate(ast)
-        
+        interpreter = Interpreter(None, builtins)
+        interpreter.source_path = path
+        if snapshot:
+            run_with_snapshot(interpreter, ast, snapshot)
+        else:
+            interpreter.evaluate(ast)
+
     except FileNotFoundError:
-        print(f"Error: Could not find file {sys.argv[1]}")
+        print(f"Error: Could not find file {path}")
     except SyntaxError as e:
         print(f"Syntax Error: {str(e)}")
     except Exception as e:
         print(f"Runtime Error: {str(e)}")
 
+def run_compiled(path, source, dump_py, cache_dir, builtins):
+    from src.transpiler import compile_statements, run_code
+    ast = Parser(Lexer(source).tokenize()).parse()
+    code, python_source = compile_statements(ast, builtins, name=path, cache_dir=cache_dir)
+    if dump_py:
+        print(python_source, end='')
+        return
+    run_code(code, builtins=builtins, source_path=path)
+
+def run_many(args):
+    scripts = collect_scripts(args.sources, args.manifest)
+    start = time.perf_counter()
+    results = run_batch(scripts, args.jobs)
+    wall = time.perf_counter() - start
+
+    for result in results:
+        print(f"==> {result.path}")
+        if result.output:
+            print(result.output, end='' if result.output.endswith('\n') else '\n')
+        if result.error:
+            print(result.error)
+    print()
+    print(format_summary(results, wall))
+    return 0 if all(result.ok for result in results) else 1
+
+def main():
+    arg_parser = argparse.ArgumentParser(prog='elton.py', description='Run Elton programs.')
+    arg_parser.add_argument('sources', nargs='*', help='source files (or directories in batch mode)')
+    arg_parser.add_argument('--batch', action='store_true',
+                            help='run many scripts in a worker pool and print a timing summary')
+    arg_parser.add_argument('--manifest', help='file listing scripts to run, one per line (implies --batch)')
+    arg_parser.add_argument('-j', '--jobs', type=int, default=None,
+                            help='number of worker processes in batch mode (default: CPU count)')
+    arg_parser.add_argument('--serve', metavar='SOCKET',
+                            help='run a warm interpreter daemon on a Unix socket (use eltonc.py as client)')
+    arg_parser.add_argument('--workers', type=int, default=1,
+                            help='number of pre-forked daemon processes (default: 1)')
+    arg_parser.add_argument('--engine', choices=('tree', 'py'), default='tree',
+                            help='tree-walking interpreter or compiled Python code (default: tree)')
+    arg_parser.add_argument('--dump-py', action='store_true',
+                            help='print the Python code the py engine generates instead of running')
+    arg_parser.add_argument('--stats', action='store_true',
+                            help='print how many operations were specialized after running')
+    arg_parser.add_argument('--memory-report', action='store_true',
+                            help='report memory allocated per function and line (slower)')
+    arg_parser.add_argument('--memory-threshold', type=float, metavar='MB',
+                            help='with --memory-report, also report as soon as live memory exceeds MB')
+    arg_parser.add_argument('--snapshot', metavar='FILE',
+                            help='restore the state before checkpoint() from FILE, creating it when missing or stale')
+    arg_parser.add_argument('--cache-dir',
+                            help='directory for cached parsed modules and compiled code (py engine)')
+    args = arg_parser.parse_args()
+
+    if args.cache_dir:
+        MODULE_CACHE.cache_dir = args.cache_dir
+
+    if args.serve:
+        from src.server import serve
+        serve(args.serve, args.workers)
+        return
+
+    if args.batch or args.manifest or len(args.sources) > 1:
+        sys.exit(run_many(args))
+    if len(args.sources) != 1:
+        print("Usage: python elton.py <source_file>")
+        sys.exit(1)
+    threshold = int(args.memory_threshold * 1024 * 1024) if args.memory_threshold else None
+    run_file(args.sources[0], args.engine, args.dump_py, args.cache_dir,
+             args.memory_report or threshold is not None, threshold, args.snapshot)
+    if args.stats:
+        from src.quicken import STATS
+        print(f"Quickening: {STATS.summary()}", file=sys.stderr)
+
 if __name__ == "__main__":
     main()
@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+# Thin client for a warm `elton.py --serve` daemon. It only uses the standard
+# library so that starting it costs no more than starting Python itself.
+import os
+import sys
+import json
+import socket
+
+DEFAULT_SOCKET = os.environ.get('ELTON_SOCKET', '/tmp/elton.sock')
+
+def run(socket_path, script, args):
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as connection:
+        connection.connect(socket_path)
+        request = {'path': os.path.abspath(script), 'args': args}
+        connection.sendall(json.dumps(request).encode('utf-8') + b'\n')
+        for line in connection.makefile('rb'):
+            message = json.loads(line)
+            if 'out' in message:
+                sys.stdout.write(message['out'])
+                sys.stdout.flush()
+            elif 'err' in message:
+                print(message['err'])
+            elif 'exit' in message:
+                return message['exit']
+    return 1
+
+def main():
+    argv = sys.argv[1:]
+    socket_path = DEFAULT_SOCKET
+    if len(argv) >= 2 and argv[0] == '--socket':
+        socket_path = argv[1]
+        argv = argv[2:]
+    if not argv:
+        print("Usage: python eltonc.py [--socket PATH] <source_file> [args...]")
+        sys.exit(1)
+    try:
+        sys.exit(run(socket_path, argv[0], argv[1:]))
+    except (FileNotFoundError, ConnectionRefusedError):
+        print(f"Error: No Elton server listening on {socket_path}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
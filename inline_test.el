@@ -0,0 +1,45 @@
+// Small helpers are inlined at their call sites (see README, Inlining).
+// Each check throws if the inlined code behaves differently from a call.
+import "lib/check.el"
+
+// Plain inlining, directly and through the higher-order builtins
+fn square(x: int) int { return x * x }
+fn add(a: int, b: int) int { return a + b }
+fn positive(x: int) bool { return x > 0 }
+check.expect("square", square(7), 49)  // 49
+check.expect("map", map("square", [1, 2, 3]), [1, 4, 9])  // [1, 4, 9]
+check.expect("listcomp", listcomp(square, [4]), [16])  // [16]
+check.expect("filter", filter("positive", [3, -1, 2]), [3, 2])  // [3, 2]
+check.expect("reduce", reduce("add", [1, 2, 3, 4], 0), 10)  // 10
+
+// Parameters are renamed, so the caller's variables are untouched
+arg x = 100
+check.expect("no capture", square(3) + x, 109)  // 109
+check.expect("x kept", x, 100)  // 100
+
+// Redefinition: a helper declared twice is not inlined, and the later
+// definition wins once it has run
+fn scale(v: int) int { return v * 2 }
+check.expect("scale before", scale(5), 10)  // 10
+fn use_triple() {
+    fn scale(v: int) int { return v * 3 }
+}
+use_triple()
+check.expect("scale after", scale(5), 15)  // 15
+check.expect("map after", map("scale", [1, 2]), [3, 6])  // [3, 6]
+
+// Builtin shadowing: a declared function wins over the builtin of the
+// same name, also inside helpers that would otherwise be inlined
+fn upper(s: string) string { return "shadowed" }
+fn shout(s: string) string { return upper(s) + "!" }
+check.expect("shadowed builtin", shout("hi"), "shadowed!")  // shadowed!
+fn keys(m: map) int { return 0 - 1 }
+check.expect("shadowed keys", keys({"a": 1}), -1)  // -1
+
+// By value: a variable with the helper's name is the value map() gets,
+// while a call by name still reaches the declared function
+fn inc(v: int) int { return v + 1 }
+arg inc = lambda(v: int) { return v + 100 }
+check.expect("call by name", inc(1), 2)  // 2
+check.expect("map by value", map(inc, [1, 2]), [101, 102])  // [101, 102]
+check.expect("map by name", map("inc", [1, 2]), [2, 3])  // [2, 3]
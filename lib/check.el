@@ -0,0 +1,7 @@
+// Shared by the self-checking *_test.el scripts: import "lib/check.el"
+fn expect(label: string, actual: int, expected: int) {
+    if (actual != expected) {
+        throw label + ": expected " + expected + ", got " + actual
+    }
+    prtoc(label, actual)
+}
@@ -0,0 +1,13 @@
+// Helpers imported by modules_test.el and closures_test.el
+arg SCALE: int = 10
+
+fn triple(x: int) int { return x * 3 }
+
+fn scaled(x: int) int {
+    // Sees this module's SCALE, not the importer's
+    return x * SCALE
+}
+
+fn mean(values: array) float {
+    return reduce(lambda(a: int, b: int) { return a + b }, values, 0) / len(values)
+}
@@ -0,0 +1,27 @@
+// Budgets: run without limits this script finishes; tests/test_samples.py
+// runs it again under each limit and expects LimitExceeded. try/catch cannot
+// stop a script that ran out of budget, so "caught" is never printed.
+fn depth(n: int) int {
+    if (n == 0) {
+        return 0
+    }
+    return 1 + depth(n - 1)
+}
+
+try {
+    prtoc("depth", depth(50))  // 50
+    arg i: int = 0
+    while (i < 5000) {
+        i = i + 1
+    }
+    prtoc("steps", i)  // 5000
+    arg squares: map = {}
+    for k in 1..2000 {
+        squares[k] = k * k
+    }
+    prtoc("map", len(squares))  // 2000
+    prtoc("string", len(repeat("ab", 2000)))  // 4000
+    prtoc("array", len(array_of(5000, [0, 0])))  // 5000
+} catch e {
+    prtoc("caught", e)
+}
@@ -0,0 +1,25 @@
+// Maps: literals, indexing, set/delete/has, keys and iteration. Each check
+// throws on a wrong result.
+import "lib/check.el"
+
+arg ages: map = {"alice": 30, "bob": 25}
+ages["carol"] = 41
+set(ages, "dave", 19)
+delete(ages, "alice")
+check.expect("lookup", ages["carol"], 41)  // 41
+check.expect("has", has(ages, "alice"), false)  // false
+check.expect("keys", keys(ages), ["bob", "carol", "dave"])  // [bob, carol, dave]
+arg total: int = 0
+for name in ages {
+    total = total + ages[name]
+}
+check.expect("values", total, 85)  // 85
+arg counts: map = {}
+for word in split("a b a c a") {
+    if (has(counts, word)) {
+        counts[word] = counts[word] + 1
+    } else {
+        counts[word] = 1
+    }
+}
+check.expect("counts", counts["a"], 3)  // 3
@@ -0,0 +1,12 @@
+// Imports: each module runs once in its own namespace. Each check throws on
+// a wrong result.
+import "lib/stats.el"
+import "lib/stats.el" as st
+import "lib/check.el"
+
+arg SCALE: int = 1000
+check.expect("module call", stats.triple(4), 12)  // 12
+check.expect("module variable", stats.SCALE, 10)  // 10
+check.expect("module namespace", stats.scaled(2), 20)  // 20
+check.expect("alias", st.mean([1, 2, 3, 6]), 3)  // 3
+check.expect("same module", st.SCALE, stats.SCALE)  // 10
@@ -0,0 +1,47 @@
+// Loop and catch variables are restored (or unbound) when the loop or catch
+// block ends, on both engines. Each check throws on a wrong result.
+import "lib/check.el"
+
+// Loop variables do not outlive their loop
+arg total: int = 0
+for i in 1..3 {
+    total = total + i
+}
+check.expect("loop sum", total, 6)  // 6
+arg leaked: string = "yes"
+try {
+    leaked = "value " + i
+} catch e {
+    leaked = "no"
+}
+check.expect("loop variable gone", leaked, "no")  // no
+arg i: int = 7
+for i in [1, 2] {
+    total = total + i
+}
+check.expect("outer loop variable kept", i, 7)  // 7
+arg none: array = []
+for j in none {
+    total = total + j
+}
+check.expect("empty loop", total, 9)  // 9
+
+arg e: string = "before"
+try {
+    throw "boom"
+} catch e {
+    check.expect("caught", e, "boom")  // boom
+}
+check.expect("catch variable restored", e, "before")  // before
+try {
+    throw "again"
+} catch fresh {
+    total = total + 1
+}
+arg unbound: string = "yes"
+try {
+    unbound = "value " + fresh
+} catch other {
+    unbound = "no"
+}
+check.expect("catch variable gone", unbound, "no")  // no
@@ -0,0 +1,19 @@
+// Array slices are views that keep the contents they had when they were
+// taken. Each check throws on a wrong result.
+import "lib/check.el"
+
+arg a: array = [1, 2, 3, 4, 5]
+arg s: array = a[1:4]
+check.expect("slice", s, [2, 3, 4])  // [2, 3, 4]
+a[1] = 99
+pop(a)
+push(a, 7)
+check.expect("after set and pop", s, [2, 3, 4])  // [2, 3, 4]
+s[0] = 0
+check.expect("slice write", s, [0, 3, 4])  // [0, 3, 4]
+check.expect("base untouched", a, [1, 99, 3, 4, 7])  // [1, 99, 3, 4, 7]
+arg inner: array = s[1:]
+check.expect("nested slice", inner, [3, 4])  // [3, 4]
+arg tail: array = a[-2:]
+insert(a, 0, 10)
+check.expect("negative slice", tail, [4, 7])  // [4, 7]
@@ -2,5 +2,11 @@ from .token import Token
 from .lexer import Lexer
 from .parser import Parser
 from .interpreter import Interpreter
+from .async_interpreter import AsyncInterpreter
+from .builtins import Builtin, register_builtin
+from .program import Program, compile_program
+from .limits import Limits, LimitExceeded
+from .io_builtins import IO_BUILTINS, with_io
 
-__all__ = ['Token', 'Lexer', 'Parser', 'Interpreter']
+__all__ = ['Token', 'Lexer', 'Parser', 'Interpreter', 'AsyncInterpreter', 'Builtin', 'register_builtin',
+           'Program', 'compile_program', 'Limits', 'LimitExceeded', 'IO_BUILTINS', 'with_io']
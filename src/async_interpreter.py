@@ -0,0 +1,318 @@
+import asyncio
+from typing import Any, Dict, Optional
+from .interpreter import Interpreter, ReturnSignal
+from .builtins import Builtin
+from .limits import LimitExceeded, Limits
+from .values import Function
+
+# Node types whose evaluation may need to suspend: calls can reach async
+# builtins, and loops yield to the event loop at their back-edges
+SUSPENDING_NODES = frozenset({'function_call', 'call_value', 'module_call', 'while', 'for'})
+
+# Inlined bodies never call async builtins, user functions or module functions
+# (see src/optimizer.py), so only the arguments of an inlined call decide; its
+# fallback call is not looked at
+INLINE_NODES = frozenset({'inline_call', 'inline_builtin'})
+
+
+def may_suspend(node) -> bool:
+    if isinstance(node, dict):
+        node_type = node.get('type')
+        if node_type in SUSPENDING_NODES:
+            return True
+        if node_type in INLINE_NODES:
+            return may_suspend(node['arguments'])
+        return any(may_suspend(value) for value in node.values())
+    if isinstance(node, list):
+        return any(may_suspend(item) for item in node)
+    return False
+
+
+# Cooperative interpreter for running many scripts on one event loop. Subtrees
+# that cannot suspend are handed to the synchronous evaluator; everything else
+# is walked here so the script can yield at loop back-edges and calls, and so
+# builtins with an async variant (sleep, read_file, ...) await instead of block.
+class AsyncInterpreter(Interpreter):
+    def __init__(self, variables: Optional[Dict[str, Any]] = None,
+                 builtins: Optional[Dict[str, Builtin]] = None, limits: Optional[Limits] = None,
+                 yield_interval: int = 64):
+        super().__init__(variables, builtins, limits)
+        self.yield_interval = yield_interval
+        self._ticks = 0
+        self._suspend_cache: Dict[int, Any] = {}
+
+    async def run(self, ast):
+        result = None
+        for node in ast:
+            result = await self.evaluate_node_async(node)
+        return result
+
+    async def checkpoint(self):
+        self._ticks += 1
+        if self._ticks >= self.yield_interval:
+            self._ticks = 0
+            await asyncio.sleep(0)
+
+    def module_interpreter(self):
+        # Imported modules run cooperatively too, so lib.fetch() can await
+        return AsyncInterpreter(None, self.builtins, yield_interval=self.yield_interval)
+
+    def _may_suspend(self, node) -> bool:
+        entry = self._suspend_cache.get(id(node))
+        if entry is None:
+            entry = (node, may_suspend(node))
+            self._suspend_cache[id(node)] = entry
+        return entry[1]
+
+    async def evaluate_block_async(self, statements):
+        result = None
+        for statement in statements:
+            result = await self.evaluate_node_async(statement)
+            if type(result) is ReturnSignal:
+                break
+        return result
+
+    async def evaluate_node_async(self, node):
+        if node is None or not self._may_suspend(node):
+            return self.evaluate_node(node)
+
+        node_type = node.get('type')
+
+        if node_type == 'function_call':
+            return await self.evaluate_function_call_async(node)
+
+        elif node_type in INLINE_NODES:
+            # Arguments that may suspend: make the call the inliner replaced
+            return await self.evaluate_node_async(node['call'])
+
+        elif node_type == 'binary_op':
+            left = await self.evaluate_node_async(node['left'])
+            operator = node['operator']
+            if operator == '&&':
+                return left and await self.evaluate_node_async(node['right'])
+            if operator == '||':
+                return left or await self.evaluate_node_async(node['right'])
+            right = await self.evaluate_node_async(node['right'])
+            result = self.evaluate_binary_op(operator, left, right)
+            if self.budget is not None:
+                self.budget.check_size(result)
+            return result
+
+        elif node_type == 'array_literal':
+            result = [await self.evaluate_node_async(element) for element in node['elements']]
+            if self.budget is not None:
+                self.budget.check_size(result)
+            return result
+
+        elif node_type == 'unary_op':
+            operand = await self.evaluate_node_async(node['operand'])
+            if node['operator'] == '-':
+                return -operand
+            return +operand
+
+        elif node_type == 'map_literal':
+            result = {}
+            for key_node, value_node in node['entries']:
+                key = self.map_key(await self.evaluate_node_async(key_node))
+                result[key] = await self.evaluate_node_async(value_node)
+            if self.budget is not None:
+                self.budget.check_size(result)
+            return result
+
+        elif node_type == 'array_access':
+            container = await self.evaluate_container_async(node['array'])
+            index = await self.evaluate_node_async(node['index'])
+            return self.index_value(container, index)
+
+        elif node_type == 'array_slice':
+            array = await self.evaluate_container_async(node['array'])
+            start = await self.evaluate_node_async(node['start']) if node['start'] is not None else None
+            end = await self.evaluate_node_async(node['end']) if node['end'] is not None else None
+            return self.slice_value(array, start, end)
+
+        elif node_type == 'conditional':
+            condition = await self.evaluate_node_async(node['condition'])
+            if condition:
+                return await self.evaluate_node_async(node['then'])
+            elif node['else'] is not None:
+                return await self.evaluate_node_async(node['else'])
+            else:
+                return None
+
+        elif node_type == 'range':
+            start = await self.evaluate_node_async(node['start'])
+            end = await self.evaluate_node_async(node['end'])
+            if not isinstance(start, (int, float)) or not isinstance(end, (int, float)):
+                raise TypeError(f"Range bounds must be numbers, got {type(start)} and {type(end)}")
+            return range(int(start), int(end) + 1)
+
+        elif node_type == 'call_value':
+            callee = await self.evaluate_node_async(node['callee'])
+            if type(callee) is not Function:
+                raise TypeError(f"Cannot call non-function type: {type(callee)}")
+            args = [await self.evaluate_node_async(arg) for arg in node['arguments']]
+            await self.checkpoint()
+            return await self.call_function_async(callee, args, callee.name)
+
+        elif node_type == 'module_call':
+            args = [await self.evaluate_node_async(arg) for arg in node['arguments']]
+            await self.checkpoint()
+            return await self.call_module_async(self.variables.get(node['module']), node['name'], args)
+
+        elif node_type == 'var_declaration':
+            value = await self.evaluate_node_async(node['value'])
+            self.variables[node['name']] = value
+            return value
+
+        elif node_type == 'assignment':
+            if node['name'] not in self.variables:
+                raise NameError(f"Variable '{node['name']}' is not defined")
+            value = await self.evaluate_node_async(node['value'])
+            self.variables[node['name']] = value
+            return value
+
+        elif node_type == 'index_assignment':
+            container = await self.evaluate_container_async(node['array'])
+            index = await self.evaluate_node_async(node['index'])
+            value = await self.evaluate_node_async(node['value'])
+            self.assign_index(container, index, value)
+            if self.budget is not None:
+                self.budget.check_size(container)
+            return value
+
+        elif node_type == 'return':
+            return ReturnSignal(await self.evaluate_node_async(node['value']))
+
+        elif node_type == 'if':
+            condition = await self.evaluate_node_async(node['condition'])
+            if condition:
+                return await self.evaluate_block_async(node['then'])
+            return await self.evaluate_block_async(node['else'])
+
+        elif node_type == 'while':
+            result = None
+            while await self.evaluate_node_async(node['condition']):
+                result = await self.evaluate_block_async(node['body'])
+                if type(result) is ReturnSignal:
+                    break
+                if self.budget is not None:
+                    self.budget.step()
+                await self.checkpoint()
+            return result
+
+        elif node_type == 'for':
+            iterator_name = node['iterator']
+            iterable = self.iteration_values(await self.evaluate_node_async(node['iterable']))
+
+            result = None
+            old_value = self.variables.get(iterator_name)
+
+            try:
+                for value in iterable:
+                    self.variables[iterator_name] = value
+                    result = await self.evaluate_block_async(node['body'])
+                    if type(result) is ReturnSignal:
+                        break
+                    if self.budget is not None:
+                        self.budget.step()
+                    await self.checkpoint()
+            finally:
+                if old_value is not None:
+                    self.variables[iterator_name] = old_value
+                else:
+                    self.variables.pop(iterator_name, None)
+
+            return result
+
+        elif node_type == 'try_catch':
+            try:
+                result = await self.evaluate_block_async(node['try_body'])
+            except LimitExceeded:
+                raise
+            except Exception as e:
+                old_value = self.variables.get(node['catch_var'])
+                self.variables[node['catch_var']] = str(e)
+
+                result = await self.evaluate_block_async(node['catch_body'])
+
+                if old_value is not None:
+                    self.variables[node['catch_var']] = old_value
+                else:
+                    del self.variables[node['catch_var']]
+
+            return result
+
+        elif node_type == 'throw':
+            error_msg = await self.evaluate_node_async(node['value'])
+            raise Exception(str(error_msg))
+
+        elif node_type == 'print':
+            args = [await self.evaluate_node_async(arg) for arg in node['arguments']]
+            print(*args, file=self.output)
+            return None
+
+        # Declarations and anything else never suspend themselves
+        return self.evaluate_node(node)
+
+    async def evaluate_container_async(self, target):
+        if isinstance(target, str):
+            return self.evaluate_container(target)
+        return await self.evaluate_node_async(target)
+
+    async def call_builtin_async(self, target, args):
+        if self.budget is not None:
+            self.budget.step()
+        if target.async_func is not None:
+            result = await target.call_async(self, args)
+        else:
+            result = target(self, args)
+        if self.budget is not None:
+            self.budget.check_size(result)
+        return result
+
+    async def evaluate_function_call_async(self, node):
+        args = [await self.evaluate_node_async(arg) for arg in node['arguments']]
+        target = self.call_target(node)
+        await self.checkpoint()
+
+        if type(target) is Builtin:
+            return await self.call_builtin_async(target, args)
+        return await self.call_function_async(target, args, node['name'])
+
+    async def call_module_async(self, module, name, args):
+        interpreter, target = self.module_target(module, name)
+        if type(target) is Builtin:
+            return await interpreter.call_builtin_async(target, args)
+        return await interpreter.call_function_async(target, args, f"{module.name}.{name}")
+
+    async def call_function_async(self, func, args, name='<anonymous>'):
+        scope = self.variables
+        if type(func) is Function:
+            if func.owner is not None and func.owner is not self:
+                if isinstance(func.owner, AsyncInterpreter):
+                    return await func.owner.call_function_async(func, args, name)
+                return func.owner.call_function(func, args, name)
+            if func.closure is not None:
+                scope = func.closure
+            func = func.definition
+        params = func['params']
+        if len(args) != len(params):
+            raise TypeError(f"Function '{name}' expects {len(params)} arguments")
+
+        budget = self.budget
+        if budget is not None:
+            budget.enter_call()
+        saved_variables = self.variables
+        self.variables = scope.copy()
+        try:
+            for param, arg in zip(params, args):
+                self.variables[param['name']] = arg
+
+            result = await self.evaluate_block_async(func['body'])
+            if type(result) is ReturnSignal:
+                result = result.value
+            return result
+        finally:
+            self.variables = saved_variables
+            if budget is not None:
+                budget.leave_call()
@@ -0,0 +1,82 @@
+import io
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import redirect_stdout
+from dataclasses import dataclass
+from typing import Iterable, List, Optional
+from .io_builtins import with_io
+from .program import Program
+
+
+@dataclass
+class ScriptResult:
+    path: str
+    output: str
+    error: Optional[str]
+    seconds: float
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+def collect_scripts(paths: Iterable[str], manifest: Optional[str] = None) -> List[str]:
+    # Expands directories to the .el files below them and appends the entries
+    # of a manifest (one path per line, relative to the manifest, '#' comments)
+    scripts = []
+    entries = list(paths)
+    if manifest is not None:
+        base = os.path.dirname(os.path.abspath(manifest))
+        with open(manifest, 'r') as f:
+            for line in f:
+                line = line.strip()
+                if line and not line.startswith('#'):
+                    entries.append(os.path.join(base, line))
+    for entry in entries:
+        if os.path.isdir(entry):
+            for root, dirs, files in os.walk(entry):
+                dirs.sort()
+                scripts.extend(os.path.join(root, name) for name in sorted(files) if name.endswith('.el'))
+        else:
+            scripts.append(entry)
+    return scripts
+
+
+def run_script(path: str) -> ScriptResult:
+    output = io.StringIO()
+    error = None
+    start = time.perf_counter()
+    try:
+        with redirect_stdout(output):
+            Program.from_file(path, with_io()).run()
+    except FileNotFoundError:
+        error = f"Error: Could not find file {path}"
+    except SyntaxError as e:
+        error = f"Syntax Error: {str(e)}"
+    except Exception as e:
+        error = f"Runtime Error: {str(e)}"
+    return ScriptResult(path, output.getvalue(), error, time.perf_counter() - start)
+
+
+def run_batch(paths: List[str], workers: Optional[int] = None) -> List[ScriptResult]:
+    # Worker processes import the package once and then run many scripts each
+    if workers == 1 or len(paths) <= 1:
+        return [run_script(path) for path in paths]
+    workers = workers or os.cpu_count() or 1
+    chunksize = max(1, len(paths) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(run_script, paths, chunksize=chunksize))
+
+
+def format_summary(results: List[ScriptResult], wall_seconds: float) -> str:
+    width = max([len(result.path) for result in results] + [6])
+    lines = [f"{'Script':<{width}}  Status  Time (ms)"]
+    for result in results:
+        status = 'ok' if result.ok else 'FAILED'
+        lines.append(f"{result.path:<{width}}  {status:<6}  {result.seconds * 1000:9.1f}")
+    failed = sum(1 for result in results if not result.ok)
+    total = sum(result.seconds for result in results)
+    lines.append(f"{len(results)} scripts, {failed} failed, "
+                 f"{total:.2f}s script time, {wall_seconds:.2f}s wall time")
+    return '\n'.join(lines)
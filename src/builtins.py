@@ -0,0 +1,407 @@
+import asyncio
+import bisect
+import heapq
+import time
+from typing import Any, Callable, Dict, Optional, Sequence, Tuple, Union
+from .values import ARRAY_TYPES, ArrayView, Function, detach_views
+
+# Elton type names usable in builtin signatures, mapped to the Python types
+# that represent them at runtime ('any' skips the check).
+TYPE_CHECKS: Dict[str, Any] = {
+    'any': None,
+    'number': (int, float),
+    'string': str,
+    'bool': bool,
+    'array': ARRAY_TYPES,
+    'map': dict,
+    'function': (str, Function),
+}
+
+TYPE_DESCRIPTIONS = {
+    'number': 'a number',
+    'string': 'a string',
+    'bool': 'a boolean',
+    'array': 'an array',
+    'map': 'a map',
+    'function': 'a function or function name',
+}
+
+ORDINALS = ['First', 'Second', 'Third', 'Fourth', 'Fifth']
+
+
+class Builtin:
+    __slots__ = ('name', 'func', 'min_args', 'max_args', 'arg_types', 'checks',
+                 'usage', 'needs_interpreter', 'async_func')
+
+    def __init__(self, name: str, func: Callable, arity: Union[int, Tuple[int, Optional[int]]],
+                 arg_types: Sequence[str] = (), usage: str = '', needs_interpreter: bool = False,
+                 async_func: Optional[Callable] = None):
+        if isinstance(arity, int):
+            arity = (arity, arity)
+        self.name = name
+        self.func = func
+        self.min_args, self.max_args = arity
+        self.arg_types = tuple(arg_types)
+        self.checks = tuple(TYPE_CHECKS[t] for t in self.arg_types)
+        self.usage = usage
+        self.needs_interpreter = needs_interpreter
+        # Coroutine variant used by AsyncInterpreter instead of blocking
+        self.async_func = async_func
+
+    def __call__(self, interpreter, args):
+        self.check_args(args)
+        if self.needs_interpreter:
+            return self.func(interpreter, *args)
+        return self.func(*args)
+
+    async def call_async(self, interpreter, args):
+        self.check_args(args)
+        if self.needs_interpreter:
+            return await self.async_func(interpreter, *args)
+        return await self.async_func(*args)
+
+    def check_args(self, args):
+        count = len(args)
+        if count < self.min_args or (self.max_args is not None and count > self.max_args):
+            raise TypeError(self.arity_message())
+        for position, check in enumerate(self.checks):
+            if position >= count:
+                break
+            if check is not None and not isinstance(args[position], check):
+                raise TypeError(self.type_message(position))
+
+    def arity_message(self) -> str:
+        low, high = self.min_args, self.max_args
+        if high is None:
+            count = f"at least {low} argument{'s' if low != 1 else ''}"
+        elif low == high:
+            count = f"{low} argument{'s' if low != 1 else ''}"
+        elif high == low + 1:
+            count = f"{low} or {high} arguments"
+        else:
+            count = f"{low} to {high} arguments"
+        message = f"{self.name}() expects {count}"
+        return f"{message}: {self.usage}" if self.usage else message
+
+    def type_message(self, position: int) -> str:
+        expected = TYPE_DESCRIPTIONS.get(self.arg_types[position], self.arg_types[position])
+        if self.max_args == 1:
+            return f"Argument to {self.name}() must be {expected}"
+        return f"{ORDINALS[position]} argument to {self.name}() must be {expected}"
+
+
+# Default registry shared by every Interpreter. Interpreters copy it on their
+# first local registration, so extending one interpreter never affects another.
+BUILTINS: Dict[str, Builtin] = {}
+
+
+def register_builtin(name: str, func: Callable, arity: Union[int, Tuple[int, Optional[int]]],
+                     arg_types: Sequence[str] = (), usage: str = '', needs_interpreter: bool = False,
+                     registry: Optional[Dict[str, Builtin]] = None,
+                     async_func: Optional[Callable] = None) -> Builtin:
+    for type_name in arg_types:
+        if type_name not in TYPE_CHECKS:
+            raise ValueError(f"Unknown argument type '{type_name}' for builtin {name}()")
+    entry = Builtin(name, func, arity, arg_types, usage, needs_interpreter, async_func)
+    (BUILTINS if registry is None else registry)[name] = entry
+    return entry
+
+
+def builtin(name: str, arity, arg_types: Sequence[str] = (), usage: str = '',
+            needs_interpreter: bool = False, registry: Optional[Dict[str, Builtin]] = None):
+    def decorator(func):
+        register_builtin(name, func, arity, arg_types, usage, needs_interpreter, registry)
+        return func
+    return decorator
+
+
+def async_variant(name: str, registry: Optional[Dict[str, Builtin]] = None):
+    # Attaches a coroutine implementation to an already registered builtin
+    def decorator(func):
+        (BUILTINS if registry is None else registry)[name].async_func = func
+        return func
+    return decorator
+
+
+@builtin('prtoc', (0, None), needs_interpreter=True)
+def _prtoc(interpreter, *args):
+    print(*args, file=interpreter.output)
+
+
+@builtin('upper', 1, ('any',), usage='string')
+def _upper(value):
+    return str(value).upper()
+
+
+@builtin('lower', 1, ('any',), usage='string')
+def _lower(value):
+    return str(value).lower()
+
+
+@builtin('join', (1, 2), ('array', 'any'), usage='array, [separator]')
+def _join(array, separator=""):
+    return str(separator).join(str(x) for x in array)
+
+
+@builtin('map', 2, ('function', 'array'), usage='function and array', needs_interpreter=True)
+def _map(interpreter, function, array):
+    func, func_name = interpreter.function_target(function)
+    return [interpreter.call_function(func, [item], func_name) for item in array]
+
+
+@async_variant('map')
+async def _map_async(interpreter, function, array):
+    func, func_name = interpreter.function_target(function)
+    return [await interpreter.call_function_async(func, [item], func_name) for item in array]
+
+
+@builtin('filter', 2, ('function', 'array'), usage='function and array', needs_interpreter=True)
+def _filter(interpreter, function, array):
+    func, func_name = interpreter.function_target(function)
+    return [item for item in array if interpreter.call_function(func, [item], func_name)]
+
+
+@async_variant('filter')
+async def _filter_async(interpreter, function, array):
+    func, func_name = interpreter.function_target(function)
+    return [item for item in array if await interpreter.call_function_async(func, [item], func_name)]
+
+
+@builtin('reduce', 3, ('function', 'array', 'any'),
+         usage='function, array, and initial value', needs_interpreter=True)
+def _reduce(interpreter, function, array, accumulator):
+    func, func_name = interpreter.function_target(function)
+    for item in array:
+        accumulator = interpreter.call_function(func, [accumulator, item], func_name)
+    return accumulator
+
+
+@async_variant('reduce')
+async def _reduce_async(interpreter, function, array, accumulator):
+    func, func_name = interpreter.function_target(function)
+    for item in array:
+        accumulator = await interpreter.call_function_async(func, [accumulator, item], func_name)
+    return accumulator
+
+
+def _callback(interpreter, function):
+    # Wraps an Elton function so Python code can call it directly
+    func, func_name = interpreter.function_target(function)
+    return lambda *args: interpreter.call_function(func, list(args), func_name)
+
+
+def _hash_key(value):
+    # Arrays and maps are not hashable; key them by their contents instead.
+    # Booleans are tagged, since true == 1 and false == 0 in Python
+    if type(value) is bool:
+        return ('bool', value)
+    if isinstance(value, ARRAY_TYPES):
+        return ('array', tuple(_hash_key(item) for item in value))
+    if isinstance(value, dict):
+        return ('map', frozenset((key, _hash_key(item)) for key, item in value.items()))
+    return value
+
+
+@builtin('sort', (1, 2), ('array', 'any'), usage='array, [reverse]')
+def _sort(array, reverse=False):
+    try:
+        return sorted(array, reverse=reverse)
+    except TypeError:
+        # Mixed element types fall back to ordering by their text
+        return sorted(array, key=str, reverse=reverse)
+
+
+@builtin('sort_by', (2, 3), ('array', 'function', 'any'), usage='array, key function, [reverse]',
+         needs_interpreter=True)
+def _sort_by(interpreter, array, func_name, reverse=False):
+    # sorted() calls the key function exactly once per element
+    try:
+        return sorted(array, key=_callback(interpreter, func_name), reverse=reverse)
+    except TypeError:
+        raise TypeError("Sort keys must be comparable")
+
+
+@builtin('top_k', (2, 3), ('array', 'number', 'function'), usage='array, k, [key function]',
+         needs_interpreter=True)
+def _top_k(interpreter, array, k, func_name=None):
+    key = _callback(interpreter, func_name) if func_name is not None else None
+    return heapq.nlargest(int(k), array, key=key)
+
+
+@builtin('bisect', 2, ('array', 'any'), usage='sorted array, value')
+def _bisect(array, value):
+    return bisect.bisect_left(array, value)
+
+
+@builtin('binary_search', 2, ('array', 'any'), usage='sorted array, value')
+def _binary_search(array, value):
+    index = bisect.bisect_left(array, value)
+    return index if index < len(array) and array[index] == value else -1
+
+
+@builtin('contains', 2, ('array', 'any'), usage='array, value')
+def _contains(array, value):
+    return value in array
+
+
+@builtin('index_of', 2, ('array', 'any'), usage='array, value')
+def _index_of(array, value):
+    for index, item in enumerate(array):
+        if item == value:
+            return index
+    return -1
+
+
+@builtin('unique', 1, ('array',), usage='array')
+def _unique(array):
+    seen = set()
+    result = []
+    for item in array:
+        key = _hash_key(item)
+        if key not in seen:
+            seen.add(key)
+            result.append(item)
+    return result
+
+
+@builtin('union', 2, ('array', 'array'), usage='array, array')
+def _union(first, second):
+    return _unique(list(first) + list(second))
+
+
+@builtin('intersection', 2, ('array', 'array'), usage='array, array')
+def _intersection(first, second):
+    other = {_hash_key(item) for item in second}
+    return _unique([item for item in first if _hash_key(item) in other])
+
+
+@builtin('difference', 2, ('array', 'array'), usage='array, array')
+def _difference(first, second):
+    other = {_hash_key(item) for item in second}
+    return _unique([item for item in first if _hash_key(item) not in other])
+
+
+@builtin('listcomp', 2, ('function', 'array'), usage='function and array', needs_interpreter=True)
+def _listcomp(interpreter, function, array):
+    func, func_name = interpreter.function_target(function)
+    return [interpreter.call_function(func, [item], func_name) for item in array]
+
+
+@async_variant('listcomp')
+async def _listcomp_async(interpreter, function, array):
+    return await _map_async(interpreter, function, array)
+
+
+@builtin('copy', 1, ('array',), usage='array')
+def _copy(array):
+    # Materializes a slice view (or duplicates an array) into a new array
+    return array.materialize() if isinstance(array, ArrayView) else list(array)
+
+
+# In-place array updates. They return the array so the size limit is checked
+# as it grows, and so `a = push(a, x)` keeps working. Slices taken from the
+# array keep their old contents (see detach_views).
+@builtin('push', 2, ('array', 'any'), usage='array, value')
+def _push(array, value):
+    if type(array) is list:
+        detach_views(array)
+    array.append(value)
+    return array
+
+
+@builtin('pop', (1, 2), ('array', 'number'), usage='array, [index]')
+def _pop(array, index=-1):
+    if not len(array):
+        raise IndexError("Cannot pop from an empty array")
+    index = int(index)
+    if index < -len(array) or index >= len(array):
+        raise IndexError(f"Array index {index} out of bounds")
+    if type(array) is list:
+        detach_views(array)
+    return array.pop(index)
+
+
+@builtin('insert', 3, ('array', 'number', 'any'), usage='array, index, value')
+def _insert(array, index, value):
+    if type(array) is list:
+        detach_views(array)
+    array.insert(int(index), value)
+    return array
+
+
+@builtin('extend', 2, ('array', 'array'), usage='array, values')
+def _extend(array, values):
+    values = list(values) if values is array or isinstance(values, ArrayView) else values
+    if type(array) is list:
+        detach_views(array)
+    array.extend(values)
+    return array
+
+
+@builtin('set', 3, ('any', 'any', 'any'), usage='array or map, index or key, value', needs_interpreter=True)
+def _set(interpreter, container, index, value):
+    if not isinstance(container, ARRAY_TYPES + (dict,)):
+        raise TypeError("First argument to set() must be an array or a map")
+    interpreter.assign_index(container, index, value)
+    return container
+
+
+@builtin('array_of', 2, ('number', 'any'), usage='length, value', needs_interpreter=True)
+def _array_of(interpreter, length, value):
+    length = int(length)
+    if length < 0:
+        raise ValueError("Array length must not be negative")
+    if interpreter.budget is not None:
+        interpreter.budget.check_length(length, 'Array')
+    # Arrays and maps are copied so the elements do not share one value
+    if isinstance(value, ARRAY_TYPES):
+        return [list(value) for _ in range(length)]
+    if isinstance(value, dict):
+        return [dict(value) for _ in range(length)]
+    return [value] * length
+
+
+@builtin('has', 2, ('map', 'any'), usage='map, key')
+def _has(mapping, key):
+    try:
+        return key in mapping
+    except TypeError:
+        return False
+
+
+@builtin('keys', 1, ('map',), usage='map')
+def _keys(mapping):
+    return list(mapping.keys())
+
+
+@builtin('values', 1, ('map',), usage='map')
+def _values(mapping):
+    return list(mapping.values())
+
+
+_MISSING = object()
+
+
+@builtin('delete', 2, ('map', 'any'), usage='map, key')
+def _delete(mapping, key):
+    # Returns whether the key was present
+    try:
+        return mapping.pop(key, _MISSING) is not _MISSING
+    except TypeError:
+        return False
+
+
+@builtin('sleep', 1, ('number',), usage='seconds')
+def _sleep(seconds):
+    time.sleep(seconds)
+
+
+@async_variant('sleep')
+async def _sleep_async(seconds):
+    await asyncio.sleep(seconds)
+
+
+@builtin('checkpoint', 0)
+def _checkpoint():
+    # Marks the end of a script's prologue; see src/snapshot.py
+    return None
@@ -1,9 +1,42 @@
+import os
+from collections.abc import Iterator
 from typing import Dict, Any, Optional
+from .builtins import BUILTINS, Builtin, register_builtin
+from .values import ARRAY_TYPES, LIVE_VIEWS, ArrayView, Function, detach_views
+from . import string_builtins  # noqa: F401  (registers the string builtins)
+from .limits import Budget, LimitExceeded, Limits
+from .modules import MODULE_CACHE, Module
+from .quicken import INDEX, Quickener
+
+class ReturnSignal:
+    # Carries a function's return value up through enclosing blocks and loops
+    __slots__ = ('value',)
+    
+    def __init__(self, value):
+        self.value = value
 
 class Interpreter:
-    def __init__(self):
-        self.variables: Dict[str, Any] = {}
+    def __init__(self, variables: Optional[Dict[str, Any]] = None,
+                 builtins: Optional[Dict[str, Builtin]] = None, limits: Optional[Limits] = None):
+        self.variables: Dict[str, Any] = dict(variables) if variables else {}
         self.functions: Dict[str, Any] = {}
+        # The builtin table is shared until this interpreter registers its own
+        self.builtins: Dict[str, Builtin] = BUILTINS if builtins is None else builtins
+        self._owns_builtins = False
+        self._call_cache: Dict[int, Any] = {}
+        # Budget accounting only happens at loop back-edges and calls, and is
+        # skipped entirely when no limits are set
+        self.budget: Optional[Budget] = Budget(limits) if limits is not None else None
+        # Stream that prtoc/print write to; None means the current sys.stdout
+        self.output = None
+        # File the program was loaded from; imports are resolved relative to it
+        self.source_path: Optional[str] = None
+        # Modules imported by this program (and by its modules), by absolute path
+        self.modules: Dict[str, Module] = {}
+        # Operand type profiles and specialized operations, by node id
+        self.quickener = Quickener()
+        self._quick = self.quickener.quick
+        self._generic = self.quickener.generic
         
     def evaluate(self, ast):
         result = None
@@ -11,6 +44,14 @@ class Interpreter:
             result = self.evaluate_node(node)
         return result
         
+    def evaluate_block(self, statements):
+        result = None
+        for statement in statements:
+            result = self.evaluate_node(statement)
+            if type(result) is ReturnSignal:
+                break
+        return result
+        
     def evaluate_node(self, node):
         if node is None:
             return None
@@ -35,93 +76,135 @@ class Interpreter:
             
         elif node_type == 'variable':
             if node['name'] not in self.variables:
+                if node['name'] in self.functions:
+                    # A declared function used as a value
+                    return Function(node['name'], self.functions[node['name']])
                 raise NameError(f"Variable '{node['name']}' is not defined")
             return self.variables[node['name']]
             
         elif node_type == 'binary_op':
             left = self.evaluate_node(node['left'])
+            operator = node['operator']
+            if operator == '&&':
+                return left and self.evaluate_node(node['right'])
+            if operator == '||':
+                return left or self.evaluate_node(node['right'])
             right = self.evaluate_node(node['right'])
-            return self.evaluate_binary_op(node['operator'], left, right)
+            key = id(node)
+            quick = self._quick.get(key)
+            if quick is not None and type(left) is quick[0] and type(right) is quick[1]:
+                result = quick[2](left, right)
+            else:
+                if quick is not None:
+                    self.quickener.deoptimize(node)
+                elif key not in self._generic:
+                    self.quickener.observe(node, operator, left, right)
+                result = self.evaluate_binary_op(operator, left, right)
+            if self.budget is not None:
+                self.budget.check_size(result)
+            return result
             
         elif node_type == 'array_literal':
-            return [self.evaluate_node(element) for element in node['elements']]
+            result = [self.evaluate_node(element) for element in node['elements']]
+            if self.budget is not None:
+                self.budget.check_size(result)
+            return result
+            
+        elif node_type == 'unary_op':
+            operand = self.evaluate_node(node['operand'])
+            if node['operator'] == '-':
+                return -operand
+            return +operand
+            
+        elif node_type == 'map_literal':
+            result = {}
+            for key_node, value_node in node['entries']:
+                result[self.map_key(self.evaluate_node(key_node))] = self.evaluate_node(value_node)
+            if self.budget is not None:
+                self.budget.check_size(result)
+            return result
             
         elif node_type == 'array_access':
-            array = self.evaluate_node({'type': 'variable', 'name': node['array']})
+            container = self.evaluate_container(node['array'])
             index = self.evaluate_node(node['index'])
-            if not isinstance(array, list):
-                raise TypeError(f"Cannot index non-array type: {type(array)}")
-            if not isinstance(index, (int, float)):
-                raise TypeError(f"Array index must be a number, got {type(index)}")
-            index = int(index)
-            if index < 0:
-                index = len(array) + index
-            if index < 0 or index >= len(array):
-                raise IndexError(f"Array index {index} out of bounds")
-            return array[index]
+            key = id(node)
+            quick = self._quick.get(key)
+            if quick is not None:
+                if type(container) is quick[0] and type(index) is quick[1]:
+                    try:
+                        return quick[2](container, index)
+                    except LookupError:
+                        pass  # Missing keys and bad indexes are reported below
+                else:
+                    self.quickener.deoptimize(node)
+            elif key not in self._generic:
+                self.quickener.observe(node, INDEX, container, index)
+            return self.index_value(container, index)
+            
+        elif node_type == 'index_assignment':
+            container = self.evaluate_container(node['array'])
+            index = self.evaluate_node(node['index'])
+            value = self.evaluate_node(node['value'])
+            self.assign_index(container, index, value)
+            if self.budget is not None:
+                self.budget.check_size(container)
+            return value
             
         elif node_type == 'array_slice':
-            array = self.evaluate_node({'type': 'variable', 'name': node['array']})
+            array = self.evaluate_container(node['array'])
             start = self.evaluate_node(node['start']) if node['start'] is not None else None
             end = self.evaluate_node(node['end']) if node['end'] is not None else None
-            if not isinstance(array, list):
-                raise TypeError(f"Cannot slice non-array type: {type(array)}")
-            if start is not None and not isinstance(start, (int, float)):
-                raise TypeError(f"Slice start must be a number, got {type(start)}")
-            if end is not None and not isinstance(end, (int, float)):
-                raise TypeError(f"Slice end must be a number, got {type(end)}")
-            start = int(start) if start is not None else None
-            end = int(end) if end is not None else None
-            return array[start:end]
-            
-        elif node_type == 'lambda_declaration':
-            return {'type': 'function', 'params': node['params'], 'body': node['body']}
+            return self.slice_value(array, start, end)
+            
+        elif node_type == 'lambda':
+            definition = {'params': node['params'], 'body': node['body'], 'return_type': None}
+            return Function('<lambda>', definition, self.variables)
+            
+        elif node_type == 'inline_call':
+            # Inlined small function; see src/optimizer.py
+            name = node['name']
+            func = self.functions.get(name)
+            if func is None or func['body'] is not node['origin']:
+                return self.evaluate_function_call(node['call'])
+            args = [self.evaluate_node(arg) for arg in node['arguments']]
+            if self.budget is not None:
+                self.budget.step()
+            variables = self.variables
+            temps = node['temps']
+            for temp, arg in zip(temps, args):
+                variables[temp] = arg
+            try:
+                return self.evaluate_node(node['body'])
+            finally:
+                for temp in temps:
+                    variables.pop(temp, None)
+            
+        elif node_type == 'inline_builtin':
+            return self.evaluate_inline_builtin(node)
+            
+        elif node_type == 'call_value':
+            callee = self.evaluate_node(node['callee'])
+            if type(callee) is not Function:
+                raise TypeError(f"Cannot call non-function type: {type(callee)}")
+            args = [self.evaluate_node(arg) for arg in node['arguments']]
+            return self.call_function(callee, args, callee.name)
             
         elif node_type == 'function_declaration':
-            self.functions[node['name']] = {
+            self.define_function(node['name'], {
                 'params': node['params'],
                 'body': node['body'],
                 'return_type': node['return_type']
-            }
+            })
             return None
             
         elif node_type == 'return':
-            return {'type': 'return', 'value': node['value']}
+            return ReturnSignal(self.evaluate_node(node['value']))
             
         elif node_type == 'variable_declaration':
             value = self.evaluate_node(node['value'])
             self.variables[node['name']] = value
             return None
             
-        elif node_type == 'if':
-            condition = self.evaluate_node(node['condition'])
-            if condition:
-                return self.evaluate_node(node['then_branch'])
-            elif node.get('else_branch'):
-                return self.evaluate_node(node['else_branch'])
-            return None
-            
-        elif node_type == 'while':
-            while self.evaluate_node(node['condition']):
-                self.evaluate_node(node['body'])
-            return None
-            
-        elif node_type == 'for':
-            iterator = node['iterator']
-            iterable = self.evaluate_node(node['iterable'])
-            if not isinstance(iterable, list):
-                raise TypeError(f"Cannot iterate over non-array type: {type(iterable)}")
-            for value in iterable:
-                self.variables[iterator] = value
-                self.evaluate_node(node['body'])
-            return None
-            
-        elif node_type == 'range':
-            start = self.evaluate_node(node['start'])
-            end = self.evaluate_node(node['end'])
-            step = self.evaluate_node(node['step']) if node.get('step') else 1
-            return list(range(int(start), int(end), int(step)))
-            
         elif node_type == 'conditional':
             condition = self.evaluate_node(node['condition'])
             if condition:
@@ -133,18 +216,16 @@ class Interpreter:
                 
         elif node_type == 'try_catch':
             try:
-                result = None
-                for statement in node['try_body']:
-                    result = self.evaluate_node(statement)
+                result = self.evaluate_block(node['try_body'])
+            except LimitExceeded:
+                raise
             except Exception as e:
                 # Store error in catch variable
                 old_value = self.variables.get(node['catch_var'])
                 self.variables[node['catch_var']] = str(e)
                 
                 # Execute catch block
-                result = None
-                for statement in node['catch_body']:
-                    result = self.evaluate_node(statement)
+                result = self.evaluate_block(node['catch_body'])
                     
                 # Restore old value if it existed
                 if old_value is not None:
@@ -161,11 +242,6 @@ class Interpreter:
         elif node_type == 'var_declaration':
             name = node['name']
             value = self.evaluate_node(node['value'])
-            if isinstance(value, str) and value.startswith('_lambda_'):
-                # Store lambda function with variable name
-                self.functions[name] = self.functions[value]
-                del self.functions[value]  # Remove temporary lambda name
-                value = name
             self.variables[name] = value
             return value
             
@@ -176,75 +252,25 @@ class Interpreter:
             self.variables[node['name']] = value
             return value
             
-        elif node_type == 'function_call':
-            return self.evaluate_function_call(node)
-            
         elif node_type == 'if':
             condition = self.evaluate_node(node['condition'])
-            result = None
             if condition:
-                for statement in node['then']:
-                    result = self.evaluate_node(statement)
-            else:
-                for statement in node['else']:
-                    result = self.evaluate_node(statement)
-            return result
+                return self.evaluate_block(node['then'])
+            return self.evaluate_block(node['else'])
             
         elif node_type == 'while':
             result = None
             while self.evaluate_node(node['condition']):
-                for statement in node['body']:
-                    result = self.evaluate_node(statement)
+                result = self.evaluate_block(node['body'])
+                if type(result) is ReturnSignal:
+                    break
+                if self.budget is not None:
+                    self.budget.step()
             return result
             
         elif node_type == 'for':
             iterator_name = node['iterator']
-            iterable = self.evaluate_node(node['iterable'])
-            
-            # Handle range expressions
-            if isinstance(iterable, dict) and iterable.get('type') == 'range':
-                # Get start value
-                start_node = iterable['start']
-                if isinstance(start_node, dict):
-                    if start_node.get('type') == 'number':
-                        start_val = int(start_node['value'])
-                    elif start_node.get('type') == 'variable':
-                        var_value = self.variables.get(start_node['name'])
-                        if var_value is None:
-                            raise NameError(f"Variable '{start_node['name']}' is not defined")
-                        start_val = int(var_value)
-                    else:
-                        raise TypeError(f"Invalid range start type: {start_node.get('type')}")
-                else:
-                    start_val = int(start_node)
-                
-                # Get end value
-                end_node = iterable['end']
-                if isinstance(end_node, dict):
-                    if end_node.get('type') == 'number':
-                        end_val = int(end_node['value'])
-                    elif end_node.get('type') == 'variable':
-                        var_value = self.variables.get(end_node['name'])
-                        if var_value is None:
-                            raise NameError(f"Variable '{end_node['name']}' is not defined")
-                        end_val = int(var_value)
-                    else:
-                        raise TypeError(f"Invalid range end type: {end_node.get('type')}")
-                else:
-                    end_val = int(end_node)
-                
-                iterable = list(range(start_val, end_val + 1))  # Make range inclusive
-                
-            elif isinstance(iterable, dict) and iterable.get('type') == 'variable':
-                # Handle array variables
-                array_name = iterable['name']
-                if array_name not in self.variables:
-                    raise NameError(f"Variable '{array_name}' is not defined")
-                iterable = self.variables[array_name]
-                if not isinstance(iterable, list):
-                    raise TypeError(f"Variable '{array_name}' is not an array")
-            elif not isinstance(iterable, list):
-                raise TypeError(f"Can only iterate over arrays and ranges, got {type(iterable)}")
+            iterable = self.iteration_values(self.evaluate_node(node['iterable']))
             
             result = None
             old_value = self.variables.get(iterator_name)
@@ -252,30 +278,110 @@ class Interpreter:
             try:
                 for value in iterable:
                     self.variables[iterator_name] = value
-                    for statement in node['body']:
-                        result = self.evaluate_node(statement)
+                    result = self.evaluate_block(node['body'])
+                    if type(result) is ReturnSignal:
+                        break
+                    if self.budget is not None:
+                        self.budget.step()
             finally:
                 if old_value is not None:
                     self.variables[iterator_name] = old_value
                 else:
-                    del self.variables[iterator_name]
+                    self.variables.pop(iterator_name, None)
                     
             return result
             
-        elif node_type == 'return':
-            return node
-            
         elif node_type == 'print':
             args = [self.evaluate_node(arg) for arg in node['arguments']]
-            print(*args)
+            print(*args, file=self.output)
             return None
             
         elif node_type == 'range':
-            # Return the range node as is, it will be handled in the for loop
-            return node
+            start = self.evaluate_node(node['start'])
+            end = self.evaluate_node(node['end'])
+            if not isinstance(start, (int, float)) or not isinstance(end, (int, float)):
+                raise TypeError(f"Range bounds must be numbers, got {type(start)} and {type(end)}")
+            return range(int(start), int(end) + 1)  # Ranges are inclusive
+            
+        elif node_type == 'import':
+            self.variables[node['alias']] = self.import_module(node['path'])
+            return None
+            
+        elif node_type == 'module_call':
+            args = [self.evaluate_node(arg) for arg in node['arguments']]
+            return self.call_module(self.variables.get(node['module']), node['name'], args)
+            
+        elif node_type == 'module_access':
+            return self.module_variable(self.variables.get(node['module']), node['name'])
             
         raise ValueError(f"Unknown node type: {node_type}")
         
+    def iteration_values(self, iterable):
+        if isinstance(iterable, (list, range, ArrayView)):
+            return iterable
+        if isinstance(iterable, dict):
+            # Maps iterate over a snapshot of their keys
+            return list(iterable)
+        if isinstance(iterable, Iterator):
+            # Lazy sources such as lines() are consumed as the loop runs
+            return iterable
+        raise TypeError(f"Can only iterate over arrays, maps, ranges and line streams, got {type(iterable)}")
+        
+    def evaluate_container(self, target):
+        # Index targets are a variable name, or a node for chained indexing
+        if isinstance(target, str):
+            if target not in self.variables:
+                raise NameError(f"Variable '{target}' is not defined")
+            return self.variables[target]
+        return self.evaluate_node(target)
+        
+    def map_key(self, key):
+        if not isinstance(key, (str, int, float, bool)):
+            raise TypeError(f"Map keys must be strings, numbers or booleans, got {type(key)}")
+        return key
+        
+    def array_index(self, array, index):
+        if not isinstance(array, ARRAY_TYPES):
+            raise TypeError(f"Cannot index non-array type: {type(array)}")
+        if not isinstance(index, (int, float)):
+            raise TypeError(f"Array index must be a number, got {type(index)}")
+        index = int(index)
+        if index < 0:
+            index = len(array) + index
+        if index < 0 or index >= len(array):
+            raise IndexError(f"Array index {index} out of bounds")
+        return index
+        
+    def index_value(self, container, index):
+        if isinstance(container, dict):
+            key = self.map_key(index)
+            if key not in container:
+                raise LookupError(f"Key {index!r} not found in map")
+            return container[key]
+        return container[self.array_index(container, index)]
+        
+    def slice_value(self, array, start, end):
+        if not isinstance(array, ARRAY_TYPES):
+            raise TypeError(f"Cannot slice non-array type: {type(array)}")
+        if start is not None and not isinstance(start, (int, float)):
+            raise TypeError(f"Slice start must be a number, got {type(start)}")
+        if end is not None and not isinstance(end, (int, float)):
+            raise TypeError(f"Slice end must be a number, got {type(end)}")
+        start = int(start) if start is not None else None
+        end = int(end) if end is not None else None
+        # Slices are views onto the array; they copy only when either side
+        # is mutated
+        return ArrayView.of(array, start, end)
+        
+    def assign_index(self, container, index, value):
+        if isinstance(container, dict):
+            container[self.map_key(index)] = value
+        else:
+            index = self.array_index(container, index)
+            if LIVE_VIEWS and type(container) is list:
+                detach_views(container)
+            container[index] = value
+        
     def evaluate_binary_op(self, operator, left, right):
         if operator == '+':
             # Handle string concatenation
@@ -306,158 +412,195 @@ class Interpreter:
             return left >= right
             
     def evaluate_function_call(self, node):
-        func_name = node['name']
         args = [self.evaluate_node(arg) for arg in node['arguments']]
         
-        if func_name == 'prtoc':
-            print(*args)
-            return None
-        elif func_name == 'upper':
-            if len(args) != 1:
-                raise TypeError("upper() expects 1 argument: string")
-            return str(args[0]).upper()
-        elif func_name == 'lower':
-            if len(args) != 1:
-                raise TypeError("lower() expects 1 argument: string")
-            return str(args[0]).lower()
-        elif func_name == 'join':
-            if len(args) not in [1, 2]:
-                raise TypeError("join() expects 1 or 2 arguments: array, [separator]")
-            array = args[0]
-            if not isinstance(array, list):
-                raise TypeError("First argument to join() must be an array")
-            separator = args[1] if len(args) == 2 else ""
-            return str(separator).join(str(x) for x in array)
-        elif func_name == 'map':
-            if len(args) != 2:
-                raise TypeError("map() expects 2 arguments: function and array")
-            func_name = args[0]
-            array = args[1]
-            if not isinstance(array, list):
-                raise TypeError("Second argument to map() must be an array")
-            if func_name not in self.functions:
-                raise NameError(f"Function '{func_name}' is not defined")
-            
-            result = []
-            old_variables = self.variables.copy()
-            for item in array:
-                self.variables[self.functions[func_name]['params'][0]['name']] = item
-                for statement in self.functions[func_name]['body']:
-                    ret = self.evaluate_node(statement)
-                    if isinstance(ret, dict) and ret.get('type') == 'return':
-                        result.append(self.evaluate_node(ret['value']))
-                        break
-            self.variables = old_variables
-            return result
-        elif func_name == 'filter':
-            if len(args) != 2:
-                raise TypeError("filter() expects 2 arguments: function and array")
-            func_name = args[0]
-            array = args[1]
-            if not isinstance(array, list):
-                raise TypeError("Second argument to filter() must be an array")
-            if func_name not in self.functions:
-                raise NameError(f"Function '{func_name}' is not defined")
-            
-            result = []
-            old_variables = self.variables.copy()
-            for item in array:
-                self.variables[self.functions[func_name]['params'][0]['name']] = item
-                for statement in self.functions[func_name]['body']:
-                    ret = self.evaluate_node(statement)
-                    if isinstance(ret, dict) and ret.get('type') == 'return':
-                        if self.evaluate_node(ret['value']):
-                            result.append(item)
-                        break
-            self.variables = old_variables
-            return result
-        elif func_name == 'reduce':
-            if len(args) != 3:
-                raise TypeError("reduce() expects 3 arguments: function, array, and initial value")
-            func_name = args[0]
-            array = args[1]
-            accumulator = args[2]
-            if not isinstance(array, list):
-                raise TypeError("Second argument to reduce() must be an array")
-            if func_name not in self.functions:
-                raise NameError(f"Function '{func_name}' is not defined")
-            
-            old_variables = self.variables.copy()
-            for item in array:
-                self.variables[self.functions[func_name]['params'][0]['name']] = accumulator
-                self.variables[self.functions[func_name]['params'][1]['name']] = item
-                for statement in self.functions[func_name]['body']:
-                    ret = self.evaluate_node(statement)
-                    if isinstance(ret, dict) and ret.get('type') == 'return':
-                        accumulator = self.evaluate_node(ret['value'])
-                        break
-            self.variables = old_variables
-            return accumulator
-        elif func_name == 'sort':
-            if len(args) not in [1, 2]:
-                raise TypeError("sort() expects 1 or 2 arguments: array, [reverse]")
-            array = args[0]
-            reverse = args[1] if len(args) == 2 else False
-            if not isinstance(array, list):
-                raise TypeError("First argument to sort() must be an array")
-            try:
-                if all(isinstance(x, (int, float)) for x in array):
-                    return sorted(array, reverse=reverse)
-                return sorted(array, key=str, reverse=reverse)
-            except TypeError:
-                raise TypeError("Array elements must be comparable")
-        elif func_name == 'unique':
-            if len(args) != 1:
-                raise TypeError("unique() expects 1 argument: array")
-            array = args[0]
-            if not isinstance(array, list):
-                raise TypeError("Argument to unique() must be an array")
-            seen = set()
+        target = self.call_target(node)
+        if type(target) is Builtin:
+            if self.budget is None:
+                return target(self, args)
+            self.budget.step()
+            return self.budget.check_size(target(self, args))
+        return self.call_function(target, args, node['name'])
+        
+    def evaluate_inline_builtin(self, node):
+        # map/listcomp/filter/reduce over an inlined function body
+        name = node['name']
+        builtin = node['builtin']
+        func = self.functions.get(name)
+        if (func is None or func['body'] is not node['origin'] or self.builtins.get(builtin) is not BUILTINS[builtin]
+                or builtin in self.functions or (node['by_value'] and name in self.variables)):
+            return self.evaluate_function_call(node['call'])
+        values = [self.evaluate_node(arg) for arg in node['arguments']]
+        if not isinstance(values[0], ARRAY_TYPES):
+            # Let the builtin report the bad argument
+            return self.builtins[builtin](self, [name] + values)
+        
+        budget = self.budget
+        if budget is not None:
+            budget.step()
+        variables = self.variables
+        temps = node['temps']
+        body = node['body']
+        evaluate = self.evaluate_node
+        try:
+            if builtin == 'reduce':
+                accumulator_name, item_name = temps
+                result = values[1]
+                for item in values[0]:
+                    variables[accumulator_name] = result
+                    variables[item_name] = item
+                    result = evaluate(body)
+                    if budget is not None:
+                        budget.step()
+                return result
+            temp = temps[0]
             result = []
-            for item in array:
-                item_str = str(item)
-                if item_str not in seen:
-                    seen.add(item_str)
+            for item in values[0]:
+                variables[temp] = item
+                value = evaluate(body)
+                if budget is not None:
+                    budget.step()
+                if builtin != 'filter':
+                    result.append(value)
+                elif value:
                     result.append(item)
+            if budget is not None:
+                budget.check_size(result)
             return result
-        elif func_name == 'listcomp':
-            if len(args) != 2:
-                raise TypeError("listcomp() expects 2 arguments: function and array")
-            func_name = args[0]
-            array = args[1]
-            if not isinstance(array, list):
-                raise TypeError("Second argument to listcomp() must be an array")
-            if func_name not in self.functions:
-                raise NameError(f"Function '{func_name}' is not defined")
-            
-            result = []
-            old_variables = self.variables.copy()
-            for item in array:
-                self.variables[self.functions[func_name]['params'][0]['name']] = item
-                for statement in self.functions[func_name]['body']:
-                    ret = self.evaluate_node(statement)
-                    if isinstance(ret, dict) and ret.get('type') == 'return':
-                        result.append(self.evaluate_node(ret['value']))
-                        break
-            self.variables = old_variables
-            return result
-        elif func_name in self.functions:
-            func = self.functions[func_name]
-            if len(args) != len(func['params']):
-                raise TypeError(f"Function '{func_name}' expects {len(func['params'])} arguments")
-            
-            old_variables = self.variables.copy()
-            for param, arg in zip(func['params'], args):
+        finally:
+            for temp in temps:
+                variables.pop(temp, None)
+        
+    def call_target(self, node):
+        # Each call site resolves its target once; the cache is only cleared
+        # when a function or builtin is redefined.
+        entry = self._call_cache.get(id(node))
+        if entry is None:
+            name = node['name']
+            value = self.variables.get(name)
+            if type(value) is Function and name not in self.builtins and name not in self.functions:
+                # Variables holding functions can change between calls
+                return value
+            entry = (node, self.resolve_function(name))
+            self._call_cache[id(node)] = entry
+        return entry[1]
+        
+    def resolve_function(self, name):
+        # Declared functions shadow builtins, so scripts keep working when a
+        # builtin with the same name is added
+        if name in self.functions:
+            return self.functions[name]
+        if name in self.builtins:
+            return self.builtins[name]
+        return self.lookup_function(name)
+        
+    def lookup_function(self, name):
+        if name not in self.functions:
+            value = self.variables.get(name)
+            if type(value) is Function:
+                return value
+            raise NameError(f"Function '{name}' is not defined")
+        return self.functions[name]
+        
+    def function_target(self, func):
+        # Higher-order builtins accept a function value or a function's name
+        if type(func) is Function:
+            return func, func.name
+        return self.lookup_function(func), func
+        
+    def define_function(self, name, func):
+        if name in self.functions or name in self.builtins:
+            self._call_cache.clear()
+        self.functions[name] = func
+        
+    def register_builtin(self, name, func, arity, arg_types=(), usage='', needs_interpreter=False):
+        if not self._owns_builtins:
+            self.builtins = dict(self.builtins)
+            self._owns_builtins = True
+        self._call_cache.clear()
+        return register_builtin(name, func, arity, arg_types, usage, needs_interpreter,
+                                registry=self.builtins)
+        
+    def import_module(self, path):
+        if self.source_path and os.path.isfile(self.source_path):
+            base = os.path.dirname(os.path.abspath(self.source_path))
+        else:
+            base = os.getcwd()
+        path = os.path.normpath(os.path.join(base, path))
+        module = self.modules.get(path)
+        if module is not None:
+            return module
+        
+        # The module runs once per program in an interpreter of its own that
+        # shares this one's builtins, limits, output and imported modules
+        interpreter = self.module_interpreter()
+        interpreter.budget = self.budget
+        interpreter.output = self.output
+        interpreter.source_path = path
+        interpreter.modules = self.modules
+        module = Module(os.path.splitext(os.path.basename(path))[0], path, interpreter)
+        self.modules[path] = module
+        try:
+            interpreter.evaluate(MODULE_CACHE.statements(path))
+        except BaseException:
+            del self.modules[path]
+            raise
+        return module
+        
+    def module_interpreter(self):
+        return Interpreter(None, self.builtins)
+        
+    def module_target(self, module, name):
+        if type(module) is not Module:
+            raise TypeError(f"Cannot call '{name}' on {type(module).__name__}, expected a module")
+        interpreter = module.interpreter
+        if name not in interpreter.builtins and name not in interpreter.functions:
+            raise NameError(f"Function '{module.name}.{name}' is not defined")
+        return interpreter, interpreter.resolve_function(name)
+        
+    def call_module(self, module, name, args):
+        interpreter, target = self.module_target(module, name)
+        if type(target) is Builtin:
+            return target(interpreter, args)
+        return interpreter.call_function(target, args, f"{module.name}.{name}")
+        
+    def module_variable(self, module, name):
+        if type(module) is not Module:
+            raise TypeError(f"Cannot read '{name}' from {type(module).__name__}, expected a module")
+        interpreter = module.interpreter
+        if name not in interpreter.variables:
+            if name in interpreter.functions:
+                # A module function used as a value, e.g. map(util.triple, xs)
+                return Function(f"{module.name}.{name}", interpreter.functions[name], None, interpreter)
+            raise NameError(f"Variable '{module.name}.{name}' is not defined")
+        return interpreter.variables[name]
+        
+    def call_function(self, func, args, name='<anonymous>'):
+        scope = self.variables
+        if type(func) is Function:
+            if func.owner is not None and func.owner is not self:
+                return func.owner.call_function(func, args, name)
+            if func.closure is not None:
+                scope = func.closure
+            func = func.definition
+        params = func['params']
+        if len(args) != len(params):
+            raise TypeError(f"Function '{name}' expects {len(params)} arguments")
+        
+        budget = self.budget
+        if budget is not None:
+            budget.enter_call()
+        saved_variables = self.variables
+        self.variables = scope.copy()
+        try:
+            for param, arg in zip(params, args):
                 self.variables[param['name']] = arg
             
-            result = None
-            for statement in func['body']:
-                result = self.evaluate_node(statement)
-                if isinstance(result, dict) and result.get('type') == 'return':
-                    result = self.evaluate_node(result['value'])
-                    break
-            
-            self.variables = old_variables
+            result = self.evaluate_block(func['body'])
+            if type(result) is ReturnSignal:
+                result = result.value
             return result
-        else:
-            raise NameError(f"Function '{func_name}' is not defined")
+        finally:
+            self.variables = saved_variables
+            if budget is not None:
+                budget.leave_call()
@@ -0,0 +1,149 @@
+import asyncio
+import mmap
+import sys
+from typing import Dict, Optional
+from .builtins import BUILTINS, TYPE_CHECKS, TYPE_DESCRIPTIONS, Builtin, async_variant, builtin
+
+# File and stdin builtins. Reading line by line with lines()/stdin_lines()
+# keeps memory constant; mapped files give random access to large inputs
+# without reading them into memory.
+#
+# They live in IO_BUILTINS, not in the default BUILTINS table, so scripts can
+# only reach the file system when the embedder opts in with with_io(), as
+# elton.py, batch mode and the daemon do for local scripts. Untrusted scripts
+# run with the default table and cannot read or overwrite files.
+
+WRITE_BUFFER_SIZE = 1 << 20
+
+IO_BUILTINS: Dict[str, Builtin] = {}
+
+
+def with_io(builtins: Optional[Dict[str, Builtin]] = None) -> Dict[str, Builtin]:
+    # A builtin table (by default BUILTINS) with the I/O builtins added
+    table = dict(BUILTINS if builtins is None else builtins)
+    table.update(IO_BUILTINS)
+    return table
+
+
+class MappedFile:
+    __slots__ = ('path', 'file', 'data')
+
+    def __init__(self, path: str):
+        self.path = path
+        self.file = open(path, 'rb')
+        try:
+            self.data = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # Empty files cannot be mapped
+            self.data = b''
+
+    def close(self):
+        if isinstance(self.data, mmap.mmap):
+            self.data.close()
+        self.file.close()
+
+    def __repr__(self):
+        return f"<mapped file {self.path}>"
+
+
+class FileWriter:
+    __slots__ = ('path', 'file')
+
+    def __init__(self, path: str, append: bool = False):
+        self.path = path
+        self.file = open(path, 'a' if append else 'w', buffering=WRITE_BUFFER_SIZE)
+
+    def __repr__(self):
+        return f"<writer {self.path}>"
+
+
+TYPE_CHECKS['mapped_file'] = MappedFile
+TYPE_DESCRIPTIONS['mapped_file'] = 'a mapped file'
+TYPE_CHECKS['writer'] = FileWriter
+TYPE_DESCRIPTIONS['writer'] = 'a file writer'
+
+
+def _iterate_lines(stream):
+    for line in stream:
+        yield line.rstrip('\r\n')
+
+
+def _file_lines(path):
+    with open(path, 'r') as f:
+        yield from _iterate_lines(f)
+
+
+@builtin('read_file', 1, ('string',), usage='path', registry=IO_BUILTINS)
+def _read_file(path):
+    with open(path, 'r') as f:
+        return f.read()
+
+
+@async_variant('read_file', IO_BUILTINS)
+async def _read_file_async(path):
+    return await asyncio.get_running_loop().run_in_executor(None, _read_file, path)
+
+
+@builtin('lines', 1, ('string',), usage='path', registry=IO_BUILTINS)
+def _lines(path):
+    # Opened eagerly so a missing file fails here rather than inside a loop
+    open(path, 'r').close()
+    return _file_lines(path)
+
+
+@builtin('read_stdin', 0, registry=IO_BUILTINS)
+def _read_stdin():
+    return sys.stdin.read()
+
+
+@builtin('stdin_lines', 0, registry=IO_BUILTINS)
+def _stdin_lines():
+    return _iterate_lines(sys.stdin)
+
+
+@builtin('mmap_open', 1, ('string',), usage='path', registry=IO_BUILTINS)
+def _mmap_open(path):
+    return MappedFile(path)
+
+
+@builtin('mmap_size', 1, ('mapped_file',), usage='mapped file', registry=IO_BUILTINS)
+def _mmap_size(mapped):
+    return len(mapped.data)
+
+
+@builtin('mmap_read', 3, ('mapped_file', 'number', 'number'), usage='mapped file, offset, length',
+         registry=IO_BUILTINS)
+def _mmap_read(mapped, offset, length):
+    offset = int(offset)
+    return mapped.data[offset:offset + int(length)].decode('utf-8', errors='replace')
+
+
+@builtin('mmap_find', (2, 3), ('mapped_file', 'string', 'number'), usage='mapped file, text, [start]',
+         registry=IO_BUILTINS)
+def _mmap_find(mapped, text, start=0):
+    return mapped.data.find(text.encode('utf-8'), int(start))
+
+
+@builtin('mmap_close', 1, ('mapped_file',), usage='mapped file', registry=IO_BUILTINS)
+def _mmap_close(mapped):
+    mapped.close()
+
+
+@builtin('open_writer', (1, 2), ('string', 'bool'), usage='path, [append]', registry=IO_BUILTINS)
+def _open_writer(path, append=False):
+    return FileWriter(path, append)
+
+
+@builtin('write', 2, ('writer', 'any'), usage='writer, text', registry=IO_BUILTINS)
+def _write(writer, text):
+    writer.file.write(str(text))
+
+
+@builtin('write_line', 2, ('writer', 'any'), usage='writer, text', registry=IO_BUILTINS)
+def _write_line(writer, text):
+    writer.file.write(f"{text}\n")
+
+
+@builtin('close', 1, ('writer',), usage='writer', registry=IO_BUILTINS)
+def _close(writer):
+    writer.file.close()
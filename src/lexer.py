@@ -120,6 +120,11 @@ class Lexer:
                 self.pos += 2
                 self.column += 2
                 continue
+            elif char == '.' and self.pos + 1 < len(self.source) and self.source[self.pos + 1] == '.':
+                self.tokens.append(Token('RANGE', '..', self.line, self.column))
+                self.pos += 2
+                self.column += 2
+                continue
                 
             # Single-character operators
             elif char in '+-*/%':
@@ -228,7 +233,7 @@ class Lexer:
                 # Check if it's a keyword
                 keywords = {'arg', 'fn', 'if', 'else', 'while', 'return', 'print', 'true', 'false', 
                           'and', 'or', 'not', 'string', 'int', 'bool', 'float', 'array', 'for', 'in',
-                          'try', 'catch', 'throw', 'lambda'}
+                          'try', 'catch', 'throw', 'lambda', 'import'}
                 token_type = 'KEYWORD' if ident in keywords else 'IDENTIFIER'
                 self.tokens.append(Token(token_type, ident, self.line, start_col))
                 continue
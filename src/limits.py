@@ -0,0 +1,68 @@
+import time
+from dataclasses import dataclass
+from typing import Optional
+from .values import ArrayView
+
+
+class LimitExceeded(RuntimeError):
+    # Raised when a script overruns its execution budget. Elton try/catch
+    # blocks never catch it, so an untrusted script cannot swallow it.
+    pass
+
+
+@dataclass(frozen=True)
+class Limits:
+    max_steps: Optional[int] = None      # loop iterations plus function calls
+    timeout: Optional[float] = None      # wall-clock seconds per run
+    max_depth: Optional[int] = None      # nested function calls
+    max_size: Optional[int] = None       # elements in one array or map / characters in one string
+
+
+class Budget:
+    # The wall clock is only read every CLOCK_INTERVAL steps
+    CLOCK_INTERVAL = 1024
+
+    __slots__ = ('limits', 'steps', 'max_steps', 'deadline', 'depth', 'max_depth', 'max_size')
+
+    def __init__(self, limits: Limits):
+        self.limits = limits
+        self.steps = 0
+        self.max_steps = limits.max_steps if limits.max_steps is not None else float('inf')
+        self.deadline = time.monotonic() + limits.timeout if limits.timeout is not None else None
+        self.depth = 0
+        self.max_depth = limits.max_depth if limits.max_depth is not None else float('inf')
+        self.max_size = limits.max_size
+
+    def step(self):
+        self.steps += 1
+        if self.steps > self.max_steps:
+            raise LimitExceeded(f"Step limit of {self.limits.max_steps} exceeded")
+        if self.deadline is not None and self.steps % self.CLOCK_INTERVAL == 0:
+            self.check_clock()
+
+    def check_clock(self):
+        if time.monotonic() > self.deadline:
+            raise LimitExceeded(f"Time limit of {self.limits.timeout}s exceeded")
+
+    def enter_call(self):
+        self.depth += 1
+        if self.depth > self.max_depth:
+            self.depth -= 1
+            raise LimitExceeded(f"Call depth limit of {self.limits.max_depth} exceeded")
+        self.step()
+
+    def leave_call(self):
+        self.depth -= 1
+
+    def check_size(self, value):
+        # Slice views count too: they grow in place once they own their list
+        if (self.max_size is not None and isinstance(value, (str, list, dict, ArrayView))
+                and len(value) > self.max_size):
+            kind = 'String' if isinstance(value, str) else 'Map' if isinstance(value, dict) else 'Array'
+            raise LimitExceeded(f"{kind} size limit of {self.max_size} exceeded")
+        return value
+
+    def check_length(self, length, kind):
+        # For builtins that know a result's size before building it
+        if self.max_size is not None and length > self.max_size:
+            raise LimitExceeded(f"{kind} size limit of {self.max_size} exceeded")
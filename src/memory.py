@@ -0,0 +1,146 @@
+import sys
+import tracemalloc
+from typing import Dict, List, Optional, Tuple
+from .builtins import Builtin
+from .interpreter import Interpreter, ReturnSignal
+
+# Memory accounting for elton.py --memory-report. Each statement is measured
+# with tracemalloc and the bytes it leaves allocated (arrays, strings, the
+# variable frames made for calls, ...) are charged to the enclosing Elton
+# function and the statement's line, minus what nested statements already
+# account for. Memory is charged where it was allocated: the numbers that
+# `i = i + 1` creates and an array then keeps are retained by that line.
+# Only this subclass does any accounting, so the plain Interpreter pays
+# nothing when the report is off.
+
+TOP_SITES = 10
+
+
+class SiteStats:
+    __slots__ = ('count', 'net_bytes', 'largest')
+
+    def __init__(self):
+        self.count = 0
+        self.net_bytes = 0
+        self.largest = 0
+
+
+def format_bytes(size: int) -> str:
+    for unit in ('B', 'KiB', 'MiB'):
+        if abs(size) < 1024:
+            return f"{size:.0f} {unit}" if unit == 'B' else f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} GiB"
+
+
+class MemoryTrackingInterpreter(Interpreter):
+    def __init__(self, *args, threshold: Optional[int] = None, report_stream=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.sites: Dict[Tuple[str, int], SiteStats] = {}
+        self.function_stack: List[str] = ['<main>']
+        # Bytes accounted to the statements nested inside each open statement
+        self.nested_bytes: List[int] = [0]
+        self.threshold = threshold
+        self.threshold_reported = False
+        self.report_stream = report_stream
+        # Bytes the accounting itself keeps alive while a statement runs
+        self.overhead = 0
+
+    def calibrate(self, samples: int = 32):
+        # Each measurement holds an int until its statement ends, which would
+        # show up as retained by every statement and freed by its parent.
+        # Measure that on empty statements so it can be subtracted.
+        noop = {'type': 'number', 'value': 0}
+        totals = []
+        for _ in range(samples):
+            self.nested_bytes.append(0)
+            self.evaluate_statement(noop)
+            totals.append(self.nested_bytes.pop())
+        self.sites.clear()
+        totals.sort()
+        self.overhead = totals[len(totals) // 2]
+
+    def evaluate(self, ast):
+        result = None
+        for node in ast:
+            result = self.evaluate_statement(node)
+        return result
+
+    def evaluate_block(self, statements):
+        result = None
+        for statement in statements:
+            result = self.evaluate_statement(statement)
+            if type(result) is ReturnSignal:
+                break
+        return result
+
+    def evaluate_statement(self, statement):
+        start = tracemalloc.get_traced_memory()[0]
+        self.nested_bytes.append(0)
+        try:
+            result = self.evaluate_node(statement)
+            if type(result) is not ReturnSignal:
+                # Statement values are discarded; drop them before measuring
+                # so temporaries are not counted as retained
+                result = None
+        finally:
+            self.account(statement, start, self.nested_bytes.pop())
+        return result
+
+    def account(self, statement, start: int, nested: int):
+        current = tracemalloc.get_traced_memory()[0]
+        total = current - start - self.overhead
+        self.nested_bytes[-1] += total
+        key = (self.function_stack[-1], statement.get('line', 0))
+        site = self.sites.get(key)
+        if site is None:
+            site = self.sites[key] = SiteStats()
+        own = total - nested
+        site.count += 1
+        site.net_bytes += own
+        site.largest = max(site.largest, own)
+        if self.threshold is not None and current > self.threshold and not self.threshold_reported:
+            self.threshold_reported = True
+            print(f"Memory threshold of {format_bytes(self.threshold)} crossed", file=self.stream())
+            self.report()
+
+    def call_function(self, func, args, name='<anonymous>'):
+        self.function_stack.append(name)
+        try:
+            return super().call_function(func, args, name)
+        finally:
+            self.function_stack.pop()
+
+    def stream(self):
+        return self.report_stream if self.report_stream is not None else sys.stderr
+
+    def report(self, limit: int = TOP_SITES):
+        current, peak = tracemalloc.get_traced_memory()
+        stream = self.stream()
+        print(f"Memory: {format_bytes(current)} live, {format_bytes(peak)} peak", file=stream)
+        # Sites that freed as much as they allocated retain nothing
+        sites = [item for item in self.sites.items() if item[1].net_bytes > 0]
+        sites = sorted(sites, key=lambda item: item[1].net_bytes, reverse=True)[:limit]
+        print(f"{'Retained':>12}  {'Largest':>12}  {'Runs':>8}  Site", file=stream)
+        for (function, line), site in sites:
+            print(f"{format_bytes(site.net_bytes):>12}  {format_bytes(site.largest):>12}  "
+                  f"{site.count:>8}  {function} line {line}", file=stream)
+
+
+def run_with_memory_report(statements, source_path: Optional[str] = None,
+                           threshold: Optional[int] = None, report_stream=None,
+                           builtins: Optional[Dict[str, Builtin]] = None) -> MemoryTrackingInterpreter:
+    interpreter = MemoryTrackingInterpreter(None, builtins, threshold=threshold, report_stream=report_stream)
+    interpreter.source_path = source_path
+    started = not tracemalloc.is_tracing()
+    if started:
+        tracemalloc.start()
+    interpreter.calibrate()
+    try:
+        interpreter.evaluate(statements)
+    finally:
+        interpreter.report()
+        if started:
+            tracemalloc.stop()
+    return interpreter
+
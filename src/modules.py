@@ -0,0 +1,97 @@
+import hashlib
+import marshal
+import os
+import sys
+import threading
+from typing import Any, Dict, Optional, Tuple
+from .lexer import Lexer
+from .optimizer import inline_functions
+from .parser import Parser
+
+# Modules are parsed once per process: every interpreter that imports the same
+# file reuses the cached statements and only runs the module's top level
+# (usually just its fn declarations) in a namespace of its own. With a cache
+# directory, parsed modules are also kept on disk between runs.
+
+
+class Module:
+    __slots__ = ('name', 'path', 'interpreter')
+
+    def __init__(self, name: str, path: str, interpreter):
+        self.name = name
+        self.path = path
+        self.interpreter = interpreter
+
+    def __repr__(self):
+        return f"<module {self.name}>"
+
+
+# Marshal format used when hashing ASTs for cache keys. Later versions write
+# back-references for objects that happen to have other references, so their
+# output for the same AST changes once it has been run; version 2 has none.
+KEY_MARSHAL_VERSION = 2
+
+
+def source_key(path: str) -> Tuple[int, int]:
+    # Identifies one version of a source file: (modification time, size)
+    stat = os.stat(path)
+    return stat.st_mtime_ns, stat.st_size
+
+
+class ModuleCache:
+    # Parsed modules keyed by absolute path, reparsed when the file changes
+    def __init__(self, cache_dir: Optional[str] = None):
+        self.cache_dir = cache_dir
+        self._modules: Dict[str, Tuple[Tuple[int, int], Tuple[Any, ...]]] = {}
+        self._lock = threading.Lock()
+
+    def statements(self, path: str) -> Tuple[Any, ...]:
+        key = source_key(path)
+        with self._lock:
+            entry = self._modules.get(path)
+        if entry is not None and entry[0] == key:
+            return entry[1]
+        statements = self._load(path, key)
+        if statements is None:
+            with open(path, 'r') as f:
+                statements = tuple(inline_functions(Parser(Lexer(f.read()).tokenize()).parse()))
+            self._store(path, key, statements)
+        with self._lock:
+            self._modules[path] = (key, statements)
+        return statements
+
+    def clear(self):
+        with self._lock:
+            self._modules.clear()
+
+    def _cache_path(self, path: str) -> Optional[str]:
+        if not self.cache_dir:
+            return None
+        digest = hashlib.sha256(path.encode('utf-8')).hexdigest()
+        return os.path.join(self.cache_dir, f"{digest}.eltm")
+
+    def _load(self, path: str, key: Tuple[int, int]):
+        cache_path = self._cache_path(path)
+        if cache_path is None or not os.path.exists(cache_path):
+            return None
+        try:
+            with open(cache_path, 'rb') as f:
+                version, cached_key, statements = marshal.load(f)
+        except (EOFError, ValueError, TypeError):
+            return None
+        if version != sys.implementation.cache_tag or tuple(cached_key) != key:
+            return None
+        return tuple(statements)
+
+    def _store(self, path: str, key: Tuple[int, int], statements):
+        cache_path = self._cache_path(path)
+        if cache_path is None:
+            return
+        os.makedirs(self.cache_dir, exist_ok=True)
+        temporary = f"{cache_path}.{os.getpid()}"
+        with open(temporary, 'wb') as f:
+            marshal.dump((sys.implementation.cache_tag, key, statements), f)
+        os.replace(temporary, cache_path)
+
+
+MODULE_CACHE = ModuleCache(os.environ.get('ELTON_CACHE_DIR'))
@@ -0,0 +1,189 @@
+from typing import Any, Dict, List, Optional, Set
+from .builtins import BUILTINS, Builtin
+
+# Inlining pass. A top-level fn whose body is a single small `return expr`,
+# and which only calls builtins that do not call back into Elton (never user
+# or module functions, which may suspend under AsyncInterpreter), is
+# substituted at its call sites and where it is passed to map, listcomp,
+# filter or reduce by name. Parameters are renamed to '<fn>$<param>' so they
+# cannot capture the caller's variables (identifiers never contain '$').
+#
+# Inlined nodes keep the original call as a fallback. At runtime the
+# interpreter checks that the function table still holds the definition made
+# from this declaration (its body list is shared with the inlined node) and
+# otherwise makes the normal call, so redefinitions behave as before.
+
+MAX_INLINE_NODES = 24
+
+# Higher-order builtins that can run an inlined body: the number of
+# parameters of the function they take, and their own argument count
+HIGHER_ORDER = {'map': (1, 2), 'listcomp': (1, 2), 'filter': (1, 2), 'reduce': (2, 3)}
+
+INLINABLE_NODES = frozenset({
+    'number', 'string', 'boolean', 'variable', 'binary_op', 'unary_op', 'array_literal',
+    'map_literal', 'array_access', 'array_slice', 'function_call', 'conditional',
+    'module_access',
+})
+
+
+class InlineCandidate:
+    __slots__ = ('name', 'params', 'expression', 'origin')
+
+    def __init__(self, name: str, params: List[str], expression, origin: List[Any]):
+        self.name = name
+        self.params = params
+        self.expression = expression
+        self.origin = origin
+
+
+def count_declarations(node, counts: Dict[str, int]):
+    if isinstance(node, dict):
+        if node.get('type') == 'function_declaration':
+            counts[node['name']] = counts.get(node['name'], 0) + 1
+        for value in node.values():
+            count_declarations(value, counts)
+    elif isinstance(node, (list, tuple)):
+        for item in node:
+            count_declarations(item, counts)
+
+
+def inlinable(node, params: List[str], size: List[int], builtins: Dict[str, Builtin]) -> bool:
+    if node is None:
+        return True
+    if isinstance(node, str):
+        return True  # array names in index nodes
+    node_type = node.get('type')
+    if node_type not in INLINABLE_NODES:
+        return False
+    size[0] += 1
+    if size[0] > MAX_INLINE_NODES:
+        return False
+    if node_type == 'function_call':
+        # A user function would see the callee's parameters through dynamic
+        # scope, and so would builtins that call back into Elton. Builtins
+        # with an async variant must stay calls so AsyncInterpreter awaits them
+        entry = builtins.get(node['name'])
+        if entry is None or entry.needs_interpreter or entry.async_func is not None:
+            return False
+    if node_type == 'module_access' and node['module'] in params:
+        return False
+    for key, value in node.items():
+        if key == 'type':
+            continue
+        if isinstance(value, list):
+            if not all(inlinable(item, params, size, builtins) for item in flatten(value)):
+                return False
+        elif isinstance(value, dict) and not inlinable(value, params, size, builtins):
+            return False
+    return True
+
+
+def flatten(values):
+    # Map literal entries are [key, value] pairs
+    for value in values:
+        if isinstance(value, list):
+            yield from value
+        else:
+            yield value
+
+
+def find_candidates(statements, builtins: Dict[str, Builtin],
+                    counts: Dict[str, int]) -> Dict[str, InlineCandidate]:
+    # counts: declarations per function name, from count_declarations()
+    # Declared functions shadow builtins of the same name, so calls to those
+    # names are user calls and cannot be inlined into another body
+    builtins = {name: entry for name, entry in builtins.items() if name not in counts}
+    candidates = {}
+    for node in statements:
+        if node.get('type') != 'function_declaration':
+            continue
+        name = node['name']
+        body = node['body']
+        if counts[name] != 1 or len(body) != 1 or body[0].get('type') != 'return':
+            continue
+        params = [param['name'] for param in node['params']]
+        expression = body[0]['value']
+        if inlinable(expression, params, [0], builtins):
+            candidates[name] = InlineCandidate(name, params, expression, body)
+    return candidates
+
+
+def rename(node, renames: Dict[str, str]):
+    # Copy of an inlinable expression with parameters renamed
+    if isinstance(node, str):
+        return renames.get(node, node)
+    if isinstance(node, list):
+        return [rename(item, renames) for item in node]
+    if not isinstance(node, dict):
+        return node
+    copied = {key: rename(value, renames) if isinstance(value, (dict, list)) else value
+              for key, value in node.items() if not key.startswith('_')}
+    node_type = node.get('type')
+    if node_type == 'variable':
+        copied['name'] = renames.get(node['name'], node['name'])
+    elif node_type in ('array_access', 'array_slice') and isinstance(node['array'], str):
+        copied['array'] = renames.get(node['array'], node['array'])
+    return copied
+
+
+class Inliner:
+    def __init__(self, candidates: Dict[str, InlineCandidate], declared: Set[str]):
+        self.candidates = candidates
+        self.declared = declared
+
+    def inline(self, candidate: InlineCandidate):
+        temps = [f"{candidate.name}${param}" for param in candidate.params]
+        body = rename(candidate.expression, dict(zip(candidate.params, temps)))
+        return temps, body
+
+    def visit(self, node):
+        if isinstance(node, list):
+            return [self.visit(item) for item in node]
+        if not isinstance(node, dict):
+            return node
+        node_type = node.get('type')
+        if node_type == 'function_declaration' and node['name'] in self.candidates:
+            # Keeps the body list, whose identity the runtime guard checks
+            return node
+        visited = {key: self.visit(value) for key, value in node.items()}
+        if node_type == 'function_call':
+            return self.visit_call(visited)
+        return visited
+
+    def visit_call(self, node):
+        name = node['name']
+        args = node['arguments']
+        candidate = self.candidates.get(name)
+        if candidate is not None and len(args) == len(candidate.params):
+            temps, body = self.inline(candidate)
+            return {'type': 'inline_call', 'name': name, 'arguments': args, 'temps': temps,
+                    'body': body, 'origin': candidate.origin, 'call': node}
+
+        if name not in HIGHER_ORDER or name in self.declared:
+            return node
+        arity, arg_count = HIGHER_ORDER[name]
+        if len(args) != arg_count:
+            return node
+        function = args[0]
+        if function.get('type') == 'string':
+            target, by_value = function['value'].strip('"'), False
+        elif function.get('type') == 'variable':
+            target, by_value = function['name'], True
+        else:
+            return node
+        candidate = self.candidates.get(target)
+        if candidate is None or len(candidate.params) != arity:
+            return node
+        temps, body = self.inline(candidate)
+        return {'type': 'inline_builtin', 'builtin': name, 'name': target, 'by_value': by_value,
+                'arguments': args[1:], 'temps': temps, 'body': body, 'origin': candidate.origin,
+                'call': node}
+
+
+def inline_functions(statements, builtins: Optional[Dict[str, Builtin]] = None) -> List[Any]:
+    counts: Dict[str, int] = {}
+    count_declarations(statements, counts)
+    candidates = find_candidates(statements, BUILTINS if builtins is None else builtins, counts)
+    if not candidates:
+        return list(statements)
+    return Inliner(candidates, set(counts)).visit(list(statements))
@@ -1,6 +1,27 @@
-from typing import List, Dict, Any
+import os
+from typing import List, Dict, Any, Optional, Tuple
 from .token import Token
 
+# Binary operator token types mapped to (precedence, right associative).
+# Higher numbers bind tighter.
+BINARY_OPERATORS: Dict[str, Tuple[int, bool]] = {
+    'OR': (1, False),
+    'AND': (2, False),
+    'EQUALS': (3, False),
+    'NOT_EQUALS': (3, False),
+    'LESS_THAN': (4, False),
+    'GREATER_THAN': (4, False),
+    'LESS_EQUALS': (4, False),
+    'GREATER_EQUALS': (4, False),
+    'PLUS': (5, False),
+    'MINUS': (5, False),
+    'MULTIPLY': (6, False),
+    'DIVIDE': (6, False),
+    'MODULO': (6, False),
+}
+
+PREFIX_OPERATORS = frozenset({'PLUS', 'MINUS'})
+
 class Parser:
     def __init__(self, tokens: List[Token]):
         self.tokens = tokens
@@ -13,6 +34,13 @@ class Parser:
         return statements
         
     def parse_statement(self):
+        # Statements carry their source line for error and memory reports
+        line = self.current_token().line
+        statement = self.parse_statement_node()
+        statement['line'] = line
+        return statement
+        
+    def parse_statement_node(self):
         token = self.current_token()
         if token.type == 'KEYWORD':
             if token.value == 'arg':
@@ -35,7 +63,21 @@ class Parser:
                 return self.parse_try_catch()
             elif token.value == 'throw':
                 return self.parse_throw()
+            elif token.value == 'import':
+                return self.parse_import()
         elif token.type == 'IDENTIFIER':
+            # Handle indexed assignment: name[index] = value
+            if self.pos + 1 < len(self.tokens) and self.tokens[self.pos + 1].type == 'LBRACKET':
+                target = self.parse_expression()
+                if (self.pos < len(self.tokens) and self.current_token().type == 'ASSIGN'
+                        and target['type'] == 'array_access'):
+                    self.consume('ASSIGN')
+                    value = self.parse_expression()
+                    if self.pos < len(self.tokens) and self.current_token().type == 'SEMICOLON':
+                        self.consume('SEMICOLON')
+                    return {'type': 'index_assignment', 'array': target['array'],
+                            'index': target['index'], 'value': value}
+                return target
             # Handle assignment to existing variable
             if self.pos + 1 < len(self.tokens) and self.tokens[self.pos + 1].type == 'ASSIGN':
                 name = token.value
@@ -53,45 +95,39 @@ class Parser:
                 return expr
         return self.parse_expression()
 
-    def parse_expression(self):
-        left = self.parse_term()
-        
-        while (self.pos < len(self.tokens) and 
-               self.current_token().type in ['PLUS', 'MINUS', 'EQUALS', 'NOT_EQUALS', 
-                                          'LESS_THAN', 'GREATER_THAN', 'LESS_EQUALS', 
-                                          'GREATER_EQUALS', 'AND', 'OR']):
-            operator = self.current_token().value
-            self.pos += 1
-            right = self.parse_term()
-            left = {'type': 'binary_op', 'operator': operator, 'left': left, 'right': right}
-        
-        return left
-        
-    def parse_term(self):
+    def parse_expression(self, min_precedence: int = 1):
+        # Precedence climbing: operands bind to the tightest operator first
         left = self.parse_factor()
-        
-        while (self.pos < len(self.tokens) and 
-               self.current_token().type in ['MULTIPLY', 'DIVIDE', 'MODULO']):
-            operator = self.current_token().value
+        tokens = self.tokens
+        count = len(tokens)
+        
+        while self.pos < count:
+            token = tokens[self.pos]
+            entry = BINARY_OPERATORS.get(token.type)
+            if entry is None or entry[0] < min_precedence:
+                break
+            precedence, right_associative = entry
             self.pos += 1
-            right = self.parse_factor()
-            left = {'type': 'binary_op', 'operator': operator, 'left': left, 'right': right}
+            right = self.parse_expression(precedence if right_associative else precedence + 1)
+            left = {'type': 'binary_op', 'operator': token.value, 'left': left, 'right': right}
         
         return left
         
     def parse_factor(self):
-        token = self.current_token()
+        if self.pos >= len(self.tokens):
+            raise SyntaxError("Unexpected end of input")
+        token = self.tokens[self.pos]
         
-        if token.type == 'PLUS' or token.type == 'MINUS':
-            operator = token.value
+        if token.type in PREFIX_OPERATORS:
             self.pos += 1
             operand = self.parse_factor()
-            return {'type': 'unary_op', 'operator': operator, 'operand': operand}
+            return {'type': 'unary_op', 'operator': token.value, 'operand': operand}
             
-        return self.parse_primary()
+        return self.parse_primary(token)
         
-    def parse_primary(self):
-        token = self.current_token()
+    def parse_primary(self, token: Optional[Token] = None):
+        if token is None:
+            token = self.current_token()
         
         if token.type == 'NUMBER':
             self.pos += 1
@@ -104,6 +140,10 @@ class Parser:
         elif token.type == 'IDENTIFIER':
             if self.pos + 1 < len(self.tokens) and self.tokens[self.pos + 1].type == 'LPAREN':
                 return self.parse_function_call()
+            elif self.pos + 1 < len(self.tokens) and self.tokens[self.pos + 1].type == 'LBRACKET':
+                return self.parse_index(token.value)
+            elif self.pos + 1 < len(self.tokens) and self.tokens[self.pos + 1].type == 'DOT':
+                return self.parse_module_member()
             else:
                 self.pos += 1
                 return {'type': 'variable', 'name': token.value}
@@ -119,6 +159,9 @@ class Parser:
         elif token.type == 'LBRACKET':
             return self.parse_array_literal()
             
+        elif token.type == 'LBRACE':
+            return self.parse_map_literal()
+            
         elif token.type == 'KEYWORD':
             if token.value == 'lambda':
                 return self.parse_lambda_declaration()
@@ -135,7 +178,7 @@ class Parser:
         # Type annotation is optional
         if self.current_token().type == 'COLON':
             self.consume('COLON')
-            type_token = self.consume('KEYWORD').value
+            type_token = self.parse_type()
         else:
             type_token = None
             
@@ -160,25 +203,19 @@ class Parser:
         
         if self.current_token().type != 'RPAREN':
             # Parse first parameter
-            param_name = self.consume('IDENTIFIER').value
-            self.consume('COLON')
-            param_type = self.consume('KEYWORD').value
-            params.append({'name': param_name, 'type': param_type})
+            params.append(self.parse_parameter())
             
             # Parse additional parameters
             while self.current_token().type == 'COMMA':
                 self.consume('COMMA')
-                param_name = self.consume('IDENTIFIER').value
-                self.consume('COLON')
-                param_type = self.consume('KEYWORD').value
-                params.append({'name': param_name, 'type': param_type})
+                params.append(self.parse_parameter())
                 
         self.consume('RPAREN')
         
         # Parse return type
         return_type = None
-        if self.current_token().type == 'KEYWORD':
-            return_type = self.consume('KEYWORD').value
+        if self.current_token().type == 'KEYWORD' or self.current_token().value == 'map':
+            return_type = self.parse_type()
             
         self.consume('LBRACE')
         body = []
@@ -190,8 +227,10 @@ class Parser:
 
     def parse_function_call(self):
         name = self.consume('IDENTIFIER').value
+        return {'type': 'function_call', 'name': name, 'arguments': self.parse_arguments()}
+
+    def parse_arguments(self):
         args = []
-        
         self.consume('LPAREN')
         if self.current_token().type != 'RPAREN':
             args.append(self.parse_expression())
@@ -199,8 +238,31 @@ class Parser:
                 self.consume('COMMA')
                 args.append(self.parse_expression())
         self.consume('RPAREN')
-        
-        return {'type': 'function_call', 'name': name, 'arguments': args}
+        return args
+
+    def parse_module_member(self):
+        # module.name(...) calls a module's function, module.name reads its variable
+        module = self.consume('IDENTIFIER').value
+        self.consume('DOT')
+        name = self.consume('IDENTIFIER').value
+        if self.pos < len(self.tokens) and self.current_token().type == 'LPAREN':
+            return {'type': 'module_call', 'module': module, 'name': name, 'arguments': self.parse_arguments()}
+        return {'type': 'module_access', 'module': module, 'name': name}
+
+    def parse_import(self):
+        self.consume('KEYWORD')  # consume 'import'
+        path = self.consume('STRING').value[1:-1]
+        token = self.tokens[self.pos] if self.pos < len(self.tokens) else None
+        if token is not None and token.type == 'IDENTIFIER' and token.value == 'as':
+            self.pos += 1
+            alias = self.consume('IDENTIFIER').value
+        else:
+            alias = os.path.splitext(os.path.basename(path))[0]
+            if not alias.isidentifier():
+                raise SyntaxError(f"Cannot derive a module name from '{path}', use 'import \"{path}\" as name'")
+        if self.pos < len(self.tokens) and self.current_token().type == 'SEMICOLON':
+            self.consume('SEMICOLON')
+        return {'type': 'import', 'path': path, 'alias': alias}
 
     def parse_return_statement(self):
         self.consume('KEYWORD')  # consume 'return'
@@ -273,22 +335,7 @@ class Parser:
             self.consume('RANGE')
             end = self.parse_expression()
             
-            # Create a range node with properly typed start and end values
-            if isinstance(start, dict) and start.get('type') == 'number':
-                start_val = start
-            elif isinstance(start, dict) and start.get('type') == 'variable':
-                start_val = start  # Keep variable reference as is
-            else:
-                start_val = {'type': 'number', 'value': float(start)}
-                
-            if isinstance(end, dict) and end.get('type') == 'number':
-                end_val = end
-            elif isinstance(end, dict) and end.get('type') == 'variable':
-                end_val = end  # Keep variable reference as is
-            else:
-                end_val = {'type': 'number', 'value': float(end)}
-                
-            iterable = {'type': 'range', 'start': start_val, 'end': end_val}
+            iterable = {'type': 'range', 'start': start, 'end': end}
         else:
             # This is an array-based for loop
             iterable = start
@@ -314,21 +361,55 @@ class Parser:
         self.consume('RBRACKET')
         return {'type': 'array_literal', 'elements': elements}
 
+    def parse_map_literal(self):
+        self.consume('LBRACE')
+        entries = []
+        
+        if self.current_token().type != 'RBRACE':
+            key = self.parse_expression()
+            self.consume('COLON')
+            entries.append([key, self.parse_expression()])
+            while self.current_token().type == 'COMMA':
+                self.consume('COMMA')
+                key = self.parse_expression()
+                self.consume('COLON')
+                entries.append([key, self.parse_expression()])
+                
+        self.consume('RBRACE')
+        return {'type': 'map_literal', 'entries': entries}
+
+    def parse_index(self, name):
+        self.consume('IDENTIFIER')
+        target = name
+        while self.pos < len(self.tokens) and self.current_token().type == 'LBRACKET':
+            self.consume('LBRACKET')
+            start = None
+            if self.current_token().type != 'COLON':
+                start = self.parse_expression()
+            if self.current_token().type == 'COLON':
+                self.consume('COLON')
+                end = None
+                if self.current_token().type != 'RBRACKET':
+                    end = self.parse_expression()
+                self.consume('RBRACKET')
+                target = {'type': 'array_slice', 'array': target, 'start': start, 'end': end}
+            else:
+                self.consume('RBRACKET')
+                target = {'type': 'array_access', 'array': target, 'index': start}
+        if self.pos < len(self.tokens) and self.current_token().type == 'LPAREN':
+            # Calling a function value taken from an array or map: fs[0](x)
+            target = {'type': 'call_value', 'callee': target, 'arguments': self.parse_arguments()}
+        return target
+
     def parse_lambda_declaration(self):
         self.consume('KEYWORD')  # consume 'lambda'
         self.consume('LPAREN')
         params = []
         if self.current_token().type != 'RPAREN':
-            name = self.consume('IDENTIFIER').value
-            self.consume('COLON')
-            type_token = self.consume('KEYWORD').value
-            params.append({'name': name, 'type': type_token})
+            params.append(self.parse_parameter())
             while self.current_token().type == 'COMMA':
                 self.consume('COMMA')
-                name = self.consume('IDENTIFIER').value
-                self.consume('COLON')
-                type_token = self.consume('KEYWORD').value
-                params.append({'name': name, 'type': type_token})
+                params.append(self.parse_parameter())
         self.consume('RPAREN')
         self.consume('LBRACE')
         body = []
@@ -366,9 +447,17 @@ class Parser:
     def parse_parameter(self):
         name = self.consume('IDENTIFIER').value
         self.consume('COLON')
-        type_token = self.consume('KEYWORD').value
+        type_token = self.parse_type()
         return {'name': name, 'type': type_token}
 
+    def parse_type(self):
+        # 'map' is not a keyword because map() is also a builtin function
+        token = self.current_token()
+        if token.type == 'IDENTIFIER' and token.value == 'map':
+            self.pos += 1
+            return token.value
+        return self.consume('KEYWORD').value
+
     def parse_conditional_expression(self):
         self.consume('KEYWORD')  # consume 'if'
         self.consume('LPAREN')
@@ -0,0 +1,109 @@
+from types import CodeType
+from typing import Any, Dict, Optional, Tuple
+from .lexer import Lexer
+from .parser import Parser
+from .interpreter import Interpreter
+from .async_interpreter import AsyncInterpreter
+from .builtins import Builtin
+from .limits import Limits
+from . import transpiler
+from .snapshot import run_with_snapshot
+from .optimizer import inline_functions
+
+
+# A compiled Elton script that can be run many times. It holds only the parsed
+# statements and the builtin table it was compiled against. Interpreters never
+# modify the AST (call caches and type profiles are kept per interpreter,
+# keyed by node), so one Program can be shared between threads; every run gets
+# its own Interpreter, so no variable or function state leaks between runs.
+class Program:
+    __slots__ = ('_statements', '_builtins', '_name', '_compiled')
+
+    def __init__(self, statements, builtins: Optional[Dict[str, Builtin]] = None, name: str = '<string>'):
+        object.__setattr__(self, '_statements', tuple(statements))
+        object.__setattr__(self, '_builtins', None if builtins is None else dict(builtins))
+        object.__setattr__(self, '_name', name)
+        # The py engine's (code, source), filled in by its first run
+        object.__setattr__(self, '_compiled', None)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Program objects are immutable")
+
+    @classmethod
+    def from_source(cls, source: str, builtins: Optional[Dict[str, Builtin]] = None,
+                    name: str = '<string>', optimize: bool = True) -> 'Program':
+        tokens = Lexer(source).tokenize()
+        statements = Parser(tokens).parse()
+        if optimize:
+            statements = inline_functions(statements, builtins)
+        return cls(statements, builtins, name)
+
+    @classmethod
+    def from_file(cls, path: str, builtins: Optional[Dict[str, Builtin]] = None) -> 'Program':
+        with open(path, 'r') as f:
+            return cls.from_source(f.read(), builtins, path)
+
+    @property
+    def statements(self) -> Tuple[Any, ...]:
+        return self._statements
+
+    @property
+    def name(self) -> str:
+        return self._name
+
+    def new_interpreter(self, inputs: Optional[Dict[str, Any]] = None,
+                        limits: Optional[Limits] = None) -> Interpreter:
+        interpreter = Interpreter(inputs, self._builtins, limits)
+        interpreter.source_path = self._name
+        return interpreter
+
+    def execute(self, interpreter: Interpreter, snapshot: Optional[str] = None):
+        # With a snapshot path, the part before checkpoint() is restored from
+        # (or saved to) that file instead of being run every time
+        if snapshot is not None:
+            return run_with_snapshot(interpreter, self._statements, snapshot)
+        return interpreter.evaluate(self._statements)
+
+    def run(self, inputs: Optional[Dict[str, Any]] = None,
+            limits: Optional[Limits] = None, engine: str = 'tree',
+            output=None, snapshot: Optional[str] = None) -> Dict[str, Any]:
+        # Runs in a fresh context and returns its variables as the results.
+        # engine='py' runs the program as compiled Python code instead.
+        if engine == 'py':
+            if limits is not None:
+                raise ValueError("Execution limits are only supported by the tree engine")
+            if snapshot is not None:
+                raise ValueError("Snapshots are only supported by the tree engine")
+            return transpiler.run_code(self.compiled()[0], inputs, self._builtins, output, self._name)
+        if engine != 'tree':
+            raise ValueError(f"Unknown engine: {engine}")
+        interpreter = self.new_interpreter(inputs, limits)
+        interpreter.output = output
+        self.execute(interpreter, snapshot)
+        return interpreter.variables
+
+    def compiled(self) -> Tuple[CodeType, str]:
+        # Compiles once per Program; racing threads compile the same code
+        compiled = self._compiled
+        if compiled is None:
+            compiled = transpiler.compile_statements(self._statements, self._builtins, self._name)
+            object.__setattr__(self, '_compiled', compiled)
+        return compiled
+
+    def python_source(self) -> str:
+        # The code the py engine runs for this program
+        return self.compiled()[1]
+
+    async def run_async(self, inputs: Optional[Dict[str, Any]] = None,
+                        limits: Optional[Limits] = None) -> Dict[str, Any]:
+        # Same as run(), but yields to the event loop at loop back-edges and
+        # calls so many scripts can share one thread
+        interpreter = AsyncInterpreter(inputs, self._builtins, limits)
+        interpreter.source_path = self._name
+        await interpreter.run(self._statements)
+        return interpreter.variables
+
+
+def compile_program(source: str, builtins: Optional[Dict[str, Builtin]] = None,
+                    name: str = '<string>') -> Program:
+    return Program.from_source(source, builtins, name)
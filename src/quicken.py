@@ -0,0 +1,124 @@
+import operator
+from typing import Any, Callable, Dict, Optional, Tuple
+
+# Adaptive specialization ("quickening") of hot AST nodes. binary_op and
+# array_access nodes record the operand types they see; once a node has seen
+# the same pair of types WARMUP times in a row it gets a specialized callable
+# stored as (left type, right type, function). The interpreter calls it
+# directly while `type(x) is` guards hold and falls back to the generic path
+# (de-optimizing the node) when they fail. Nodes that keep changing types, or
+# that have no specialization, are left generic.
+#
+# All of this state lives in a Quickener owned by one interpreter and keyed
+# by node id, never in the AST itself, so a Program can still be shared
+# between threads and one program's profile never affects another's.
+
+WARMUP = 8
+MAX_DEOPTS = 4
+INDEX = '[]'
+
+
+class QuickenStats:
+    __slots__ = ('specialized', 'deoptimized', 'unspecializable')
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.specialized = 0
+        self.deoptimized = 0
+        self.unspecializable = 0
+
+    def summary(self) -> str:
+        return (f"{self.specialized} sites specialized, {self.deoptimized} de-optimized, "
+                f"{self.unspecializable} left generic")
+
+
+STATS = QuickenStats()
+
+
+def _concat_left(left, right):
+    return left + str(right)
+
+
+def _concat_right(left, right):
+    return str(left) + right
+
+
+def _item(container, index):
+    return container[int(index)]
+
+
+NUMBER_PAIRS = [(int, int), (float, float), (int, float), (float, int)]
+NUMBER_OPERATORS = {'+': operator.add, '-': operator.sub, '*': operator.mul, '%': operator.mod,
+                    '<': operator.lt, '>': operator.gt, '<=': operator.le, '>=': operator.ge,
+                    '==': operator.eq, '!=': operator.ne}
+
+SPECIALIZATIONS: Dict[Tuple[str, type, type], Callable] = {}
+for _pair in NUMBER_PAIRS:
+    for _symbol, _function in NUMBER_OPERATORS.items():
+        SPECIALIZATIONS[(_symbol, *_pair)] = _function
+for _symbol in ('==', '!=', '<', '>', '<=', '>='):
+    SPECIALIZATIONS[(_symbol, str, str)] = NUMBER_OPERATORS[_symbol]
+for _symbol in ('==', '!='):
+    SPECIALIZATIONS[(_symbol, bool, bool)] = NUMBER_OPERATORS[_symbol]
+SPECIALIZATIONS[('+', str, str)] = operator.add
+for _number in (int, float, bool):
+    SPECIALIZATIONS[('+', str, _number)] = _concat_left
+    SPECIALIZATIONS[('+', _number, str)] = _concat_right
+SPECIALIZATIONS[(INDEX, list, int)] = _item
+SPECIALIZATIONS[(INDEX, list, float)] = _item
+SPECIALIZATIONS[(INDEX, dict, str)] = operator.getitem
+
+
+class SiteProfile:
+    # Also keeps the node alive, so its id is not reused while profiled
+    __slots__ = ('node', 'types', 'count', 'deopts')
+
+    def __init__(self, node):
+        self.node = node
+        self.types: Optional[Tuple[type, type]] = None
+        self.count = 0
+        self.deopts = 0
+
+
+class Quickener:
+    def __init__(self, stats: QuickenStats = STATS):
+        self.stats = stats
+        # Specialized sites: id(node) -> (left type, right type, function)
+        self.quick: Dict[int, Tuple[type, type, Callable]] = {}
+        # Sites left generic, which are no longer observed
+        self.generic: Dict[int, Any] = {}
+        self.profiles: Dict[int, SiteProfile] = {}
+
+    def observe(self, node, symbol: str, left, right):
+        key = id(node)
+        profile = self.profiles.get(key)
+        if profile is None:
+            profile = self.profiles[key] = SiteProfile(node)
+        types = (type(left), type(right))
+        if profile.types != types:
+            profile.types = types
+            profile.count = 1
+            return
+        profile.count += 1
+        if profile.count < WARMUP:
+            return
+        function = SPECIALIZATIONS.get((symbol, *types))
+        if function is None:
+            self.generic[key] = node
+            self.stats.unspecializable += 1
+            return
+        self.quick[key] = (types[0], types[1], function)
+        self.stats.specialized += 1
+
+    def deoptimize(self, node):
+        key = id(node)
+        del self.quick[key]
+        self.stats.deoptimized += 1
+        profile = self.profiles[key]
+        profile.types = None
+        profile.deopts += 1
+        # Sites that keep flipping between types stay generic
+        if profile.deopts >= MAX_DEOPTS:
+            self.generic[key] = node
@@ -0,0 +1,126 @@
+import json
+import os
+import signal
+import socket
+import socketserver
+import threading
+from typing import Dict, List, Tuple
+from .io_builtins import with_io
+from .program import Program
+
+# Wire protocol: the client sends one JSON line {"path": ..., "args": [...]};
+# the server answers with JSON lines {"out": text} as the script prints,
+# optionally {"err": message}, and finally {"exit": status}.
+
+
+class ProgramCache:
+    # Compiled programs keyed by path, recompiled when the file changes
+    def __init__(self):
+        self._programs: Dict[str, Tuple[Tuple[int, int], Program]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, path: str) -> Program:
+        stat = os.stat(path)
+        key = (stat.st_mtime_ns, stat.st_size)
+        with self._lock:
+            entry = self._programs.get(path)
+        if entry is not None and entry[0] == key:
+            return entry[1]
+        program = Program.from_file(path, with_io())
+        with self._lock:
+            self._programs[path] = (key, program)
+        return program
+
+
+class StreamWriter:
+    # File-like object handed to the interpreter as its output stream
+    FLUSH_SIZE = 4096
+
+    def __init__(self, connection: socket.socket):
+        self.connection = connection
+        self.buffer: List[str] = []
+        self.size = 0
+
+    def write(self, text: str) -> int:
+        self.buffer.append(text)
+        self.size += len(text)
+        if self.size >= self.FLUSH_SIZE or text.endswith('\n'):
+            self.flush()
+        return len(text)
+
+    def flush(self):
+        if self.buffer:
+            send_message(self.connection, {'out': ''.join(self.buffer)})
+            self.buffer = []
+            self.size = 0
+
+
+def send_message(connection: socket.socket, message: dict):
+    connection.sendall(json.dumps(message).encode('utf-8') + b'\n')
+
+
+class RequestHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        request = json.loads(self.rfile.readline())
+        path = request['path']
+        writer = StreamWriter(self.connection)
+        error = None
+        try:
+            program = self.server.programs.get(path)
+            interpreter = program.new_interpreter({'argv': list(request.get('args', []))})
+            interpreter.output = writer
+            program.execute(interpreter)
+        except FileNotFoundError:
+            error = f"Error: Could not find file {path}"
+        except SyntaxError as e:
+            error = f"Syntax Error: {str(e)}"
+        except Exception as e:
+            error = f"Runtime Error: {str(e)}"
+        writer.flush()
+        if error is not None:
+            send_message(self.connection, {'err': error})
+        send_message(self.connection, {'exit': 0 if error is None else 1})
+
+
+class EltonServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def __init__(self, socket_path: str):
+        self.programs = ProgramCache()
+        super().__init__(socket_path, RequestHandler)
+
+
+def _terminate(signum, frame):
+    raise KeyboardInterrupt
+
+
+def serve(socket_path: str, workers: int = 1):
+    # With several workers the listening socket is shared by pre-forked
+    # processes, so CPU-bound scripts are not serialised on one GIL
+    if os.path.exists(socket_path):
+        os.unlink(socket_path)
+    server = EltonServer(socket_path)
+    signal.signal(signal.SIGTERM, _terminate)
+    children = []
+    try:
+        for _ in range(workers - 1):
+            pid = os.fork()
+            if pid == 0:
+                try:
+                    server.serve_forever()
+                finally:
+                    os._exit(0)
+            children.append(pid)
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        for pid in children:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+        server.server_close()
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
+
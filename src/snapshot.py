@@ -0,0 +1,222 @@
+import hashlib
+import marshal
+import mmap
+import os
+import sys
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from .builtins import Builtin
+from .interpreter import Interpreter
+from .modules import KEY_MARSHAL_VERSION, Module, source_key
+from .values import ArrayView, Function
+
+# Warm starts: a script marks the end of its prologue with a top-level
+# checkpoint() call. The first run executes the prologue and writes the
+# interpreter's variables and functions to a marshal file; later runs map that
+# file, restore the state in one bulk load and continue after the checkpoint.
+# Snapshots are keyed by a hash of the prologue, so editing it (or upgrading
+# Python) invalidates them, and record the modules it imported, so editing one
+# of those does too. The prologue must not depend on run inputs, and
+# the inputs themselves are never saved: each run supplies its own.
+
+CHECKPOINT = 'checkpoint'
+FORMAT_VERSION = 4
+
+
+def split_at_checkpoint(statements) -> Tuple[Tuple[Any, ...], Tuple[Any, ...]]:
+    statements = tuple(statements)
+    for position, node in enumerate(statements):
+        if node.get('type') == 'function_call' and node['name'] == CHECKPOINT:
+            return statements[:position], statements[position + 1:]
+    raise ValueError("Snapshots need a top-level checkpoint() call after the prologue")
+
+
+def snapshot_key(prologue, builtins: Dict[str, Builtin]) -> str:
+    digest = hashlib.sha256(marshal.dumps(prologue, KEY_MARSHAL_VERSION))
+    digest.update(' '.join(sorted(builtins)).encode('utf-8'))
+    digest.update(f"{FORMAT_VERSION} {sys.implementation.cache_tag}".encode('utf-8'))
+    return digest.hexdigest()
+
+
+# Values marshal cannot store are saved as tagged tuples (Elton values are
+# never tuples): imported modules by path, module functions by module path
+# and name, and other function values with their definition and closure. A
+# closure is None, SCOPE_GLOBALS for the interpreter's own variables, or an
+# index into the snapshot's list of captured scopes.
+MODULE = 'module'
+MODULE_FUNCTION = 'module_fn'
+FUNCTION = 'fn'
+SCOPE_GLOBALS = -1
+
+
+class StateEncoder:
+    def __init__(self, interpreter: Interpreter):
+        self.interpreter = interpreter
+        self.scopes: List[Dict[str, Any]] = []
+        self._scope_indexes: Dict[int, int] = {}
+        # Encoded arrays and maps by id() of the original, which is kept
+        # alive next to it, so values shared between variables stay shared
+        self._memo: Dict[int, Tuple[Any, Any]] = {}
+
+    def encode(self, value):
+        kind = type(value)
+        if kind is Function:
+            return self.function(value)
+        if kind is Module:
+            return (MODULE, value.path)
+        if kind is list or kind is dict or kind is ArrayView:
+            entry = self._memo.get(id(value))
+            if entry is not None:
+                return entry[1]
+            if kind is dict:
+                encoded = {}
+                self._memo[id(value)] = (value, encoded)
+                for key, item in value.items():
+                    encoded[key] = self.encode(item)
+            else:
+                encoded = []
+                self._memo[id(value)] = (value, encoded)
+                encoded.extend(self.encode(item) for item in value)
+            return encoded
+        return value
+
+    def function(self, func: Function):
+        owner = func.owner
+        if owner is not None and owner is not self.interpreter:
+            return (MODULE_FUNCTION, owner.source_path, func.name.rsplit('.', 1)[-1])
+        return (FUNCTION, func.name, func.definition, self.scope(func.closure))
+
+    def scope(self, scope: Optional[Dict[str, Any]]):
+        if scope is None:
+            return None
+        if scope is self.interpreter.variables:
+            return SCOPE_GLOBALS
+        index = self._scope_indexes.get(id(scope))
+        if index is None:
+            index = self._scope_indexes[id(scope)] = len(self.scopes)
+            self.scopes.append({})
+            self.scopes[index] = {name: self.encode(value) for name, value in scope.items()}
+        return index
+
+
+class StateDecoder:
+    def __init__(self, interpreter: Interpreter, scopes: List[Dict[str, Any]]):
+        self.interpreter = interpreter
+        self.scopes = scopes
+        self._decoded_scopes: Dict[int, Dict[str, Any]] = {}
+        self._memo: Dict[int, Any] = {}
+
+    def decode(self, value):
+        kind = type(value)
+        if kind is tuple:
+            tag = value[0]
+            if tag == MODULE:
+                return self.interpreter.import_module(value[1])
+            if tag == MODULE_FUNCTION:
+                return self.interpreter.module_variable(self.interpreter.import_module(value[1]), value[2])
+            return Function(value[1], value[2], self.scope(value[3]))
+        if kind is list or kind is dict:
+            decoded = self._memo.get(id(value))
+            if decoded is not None:
+                return decoded
+            if kind is dict:
+                decoded = self._memo[id(value)] = {}
+                for key, item in value.items():
+                    decoded[key] = self.decode(item)
+            else:
+                decoded = self._memo[id(value)] = []
+                decoded.extend(self.decode(item) for item in value)
+            return decoded
+        return value
+
+    def scope(self, index: Optional[int]):
+        if index is None:
+            return None
+        if index == SCOPE_GLOBALS:
+            return self.interpreter.variables
+        scope = self._decoded_scopes.get(index)
+        if scope is None:
+            scope = self._decoded_scopes[index] = {}
+            for name, value in self.scopes[index].items():
+                scope[name] = self.decode(value)
+        return scope
+
+
+def capture(interpreter: Interpreter, inputs: Iterable[str] = ()) -> Dict[str, Any]:
+    # inputs: names the run was given, which are left out
+    inputs = set(inputs)
+    encoder = StateEncoder(interpreter)
+    variables = {name: encoder.encode(value) for name, value in interpreter.variables.items()
+                 if name not in inputs}
+    return {
+        'variables': variables,
+        'scopes': encoder.scopes,
+        'functions': dict(interpreter.functions),
+    }
+
+
+def module_sources(interpreter: Interpreter) -> Dict[str, Tuple[int, int]]:
+    # Every module imported so far, including modules imported by modules
+    return {path: source_key(path) for path in interpreter.modules}
+
+
+def sources_current(sources: Dict[str, Any]) -> bool:
+    for path, key in sources.items():
+        try:
+            if source_key(path) != tuple(key):
+                return False
+        except OSError:
+            return False
+    return True
+
+
+def save_snapshot(path: str, interpreter: Interpreter, key: str, inputs: Iterable[str] = ()):
+    state = capture(interpreter, inputs)
+    state['key'] = key
+    state['sources'] = module_sources(interpreter)
+    try:
+        data = marshal.dumps(state)
+    except ValueError as e:
+        raise TypeError(f"Cannot snapshot the prologue's variables: {e}") from e
+    temporary = f"{path}.{os.getpid()}"
+    with open(temporary, 'wb') as f:
+        f.write(data)
+    os.replace(temporary, path)
+
+
+def load_snapshot(path: str, key: str) -> Optional[Dict[str, Any]]:
+    try:
+        with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            state = marshal.loads(data)
+    except (OSError, ValueError, EOFError, TypeError):
+        return None
+    if not isinstance(state, dict) or state.get('key') != key:
+        return None
+    if not sources_current(state['sources']):
+        return None
+    return state
+
+
+def restore(interpreter: Interpreter, state: Dict[str, Any]):
+    inputs = interpreter.variables
+    interpreter.variables = {}
+    interpreter.functions.update(state['functions'])
+    interpreter._call_cache.clear()
+    decoder = StateDecoder(interpreter, state['scopes'])
+    for name, value in state['variables'].items():
+        interpreter.variables[name] = decoder.decode(value)
+    interpreter.variables.update(inputs)
+
+
+def run_with_snapshot(interpreter: Interpreter, statements, path: str):
+    # Restores the prologue's state from path when it is current, otherwise
+    # runs the prologue and writes a new snapshot; then runs the rest
+    prologue, rest = split_at_checkpoint(statements)
+    key = snapshot_key(prologue, interpreter.builtins)
+    state = load_snapshot(path, key)
+    if state is not None:
+        restore(interpreter, state)
+    else:
+        inputs = set(interpreter.variables)
+        interpreter.evaluate(prologue)
+        save_snapshot(path, interpreter, key, inputs)
+    return interpreter.evaluate(rest)
@@ -0,0 +1,83 @@
+import re
+from functools import lru_cache
+from .builtins import builtin
+from .values import ARRAY_TYPES
+
+# Native string functions, so text processing runs in Python's string methods
+# instead of character-by-character loops in Elton. Positions are 0-based and
+# negative positions count from the end, as with array indexes.
+
+PATTERN_CACHE_SIZE = 256
+
+
+@lru_cache(maxsize=PATTERN_CACHE_SIZE)
+def _compile(pattern):
+    try:
+        return re.compile(pattern)
+    except re.error as e:
+        raise ValueError(f"Invalid regular expression '{pattern}': {e}")
+
+
+@builtin('len', 1, ('any',), usage='string, array or map')
+def _len(value):
+    if not isinstance(value, (str, dict) + ARRAY_TYPES):
+        raise TypeError("Argument to len() must be a string, an array or a map")
+    return len(value)
+
+
+@builtin('split', (1, 2), ('string', 'string'), usage='string, [separator]')
+def _split(text, separator=None):
+    # Without a separator, splits on runs of whitespace
+    return text.split(separator)
+
+
+@builtin('find', (2, 3), ('string', 'string', 'number'), usage='string, text, [start]')
+def _find(text, part, start=0):
+    return text.find(part, int(start))
+
+
+@builtin('replace', (3, 4), ('string', 'string', 'string', 'number'), usage='string, old, new, [count]')
+def _replace(text, old, new, count=-1):
+    return text.replace(old, new, int(count))
+
+
+@builtin('substring', (2, 3), ('string', 'number', 'number'), usage='string, start, [end]')
+def _substring(text, start, end=None):
+    return text[int(start):int(end) if end is not None else None]
+
+
+@builtin('starts_with', 2, ('string', 'string'), usage='string, prefix')
+def _starts_with(text, prefix):
+    return text.startswith(prefix)
+
+
+@builtin('ends_with', 2, ('string', 'string'), usage='string, suffix')
+def _ends_with(text, suffix):
+    return text.endswith(suffix)
+
+
+@builtin('trim', (1, 2), ('string', 'string'), usage='string, [characters]')
+def _trim(text, characters=None):
+    return text.strip(characters)
+
+
+@builtin('repeat', 2, ('string', 'number'), usage='string, count', needs_interpreter=True)
+def _repeat(interpreter, text, count):
+    count = int(count)
+    if interpreter.budget is not None:
+        interpreter.budget.check_length(len(text) * max(count, 0), 'String')
+    return text * count
+
+
+@builtin('match', 2, ('string', 'string'), usage='pattern, string')
+def _match(pattern, text):
+    # The first match and its groups as [whole, group 1, ...], or [] if none
+    found = _compile(pattern).search(text)
+    if found is None:
+        return []
+    return [found.group(0)] + [group if group is not None else '' for group in found.groups()]
+
+
+@builtin('find_all', 2, ('string', 'string'), usage='pattern, string')
+def _find_all(pattern, text):
+    return [found.group(0) for found in _compile(pattern).finditer(text)]
@@ -0,0 +1,551 @@
+import hashlib
+import marshal
+import os
+import re
+import sys
+from types import CodeType
+from typing import Any, Dict, List, Optional, Set, Tuple
+from .builtins import BUILTINS, Builtin
+from .interpreter import Interpreter
+from .modules import KEY_MARSHAL_VERSION
+from .values import Function
+
+# Ahead-of-time backend: translates an Elton AST into Python source and
+# compiles it with compile(), so loops and arithmetic run as CPython bytecode.
+#
+# Generated names are prefixed so they never clash with Python keywords or
+# with the runtime helpers: Elton variables become v_<name>, user functions
+# f_<name> and builtins b_<name>. Functions in generated code see the
+# top-level variables and their own locals (lexical scope), whereas the tree
+# interpreter lets a callee see a copy of its caller's variables. Lambdas are
+# hoisted into nested defs and close over the enclosing function's locals;
+# as function values they are Function objects whose definition is the
+# compiled Python function. Execution limits are not supported by this engine.
+
+
+class TranspileError(Exception):
+    pass
+
+
+BINARY_TEMPLATES = {
+    '+': '_add({}, {})',
+    '-': '({} - {})',
+    '*': '({} * {})',
+    '/': '_div({}, {})',
+    '%': '({} % {})',
+    '==': '({} == {})',
+    '!=': '({} != {})',
+    '<': '({} < {})',
+    '>': '({} > {})',
+    '<=': '({} <= {})',
+    '>=': '({} >= {})',
+    '&&': '({} and {})',
+    '||': '({} or {})',
+}
+
+
+def _add(left, right):
+    if isinstance(left, str) or isinstance(right, str):
+        return str(left) + str(right)
+    return left + right
+
+
+def _div(left, right):
+    if right == 0:
+        raise ZeroDivisionError("Division by zero")
+    return left / right
+
+
+def _range(start, end):
+    if not isinstance(start, (int, float)) or not isinstance(end, (int, float)):
+        raise TypeError(f"Range bounds must be numbers, got {type(start)} and {type(end)}")
+    return range(int(start), int(end) + 1)  # Ranges are inclusive
+
+
+def _call_value(callee, args):
+    if type(callee) is not Function:
+        raise TypeError(f"Cannot call non-function type: {type(callee)}")
+    if callee.owner is not None:
+        # A function of an imported module, which runs on the tree interpreter
+        return callee.owner.call_function(callee, list(args), callee.name)
+    return callee.definition(*args)
+
+
+# Marks a loop variable that had no value before the loop
+_MISSING = object()
+
+
+def _message(error: Exception) -> str:
+    # Turns errors about mangled names back into Elton's wording
+    if isinstance(error, UnboundLocalError):
+        # Has no .name; the message is "... local variable 'v_x' ..."
+        found = re.search(r"'([vf]_\w+)'", str(error))
+        if found:
+            error.name = found.group(1)
+    if isinstance(error, NameError) and getattr(error, 'name', None):
+        name = error.name
+        if name.startswith('v_'):
+            return f"Variable '{name[2:]}' is not defined"
+        if name.startswith('f_'):
+            return f"Function '{name[2:]}' is not defined"
+    return str(error)
+
+
+class PyRuntime(Interpreter):
+    # Stands in for the interpreter in generated code. Builtins that call back
+    # into Elton (map, filter, sort_by, ...) find compiled functions in
+    # self.functions and call them directly.
+    def call_function(self, func, args, name='<anonymous>'):
+        if type(func) is Function:
+            if func.owner is not None:
+                return func.owner.call_function(func, args, name)
+            func = func.definition
+        return func(*args)
+
+
+class FunctionScope:
+    def __init__(self, params: List[str], parent: Optional['FunctionScope'] = None):
+        self.locals: Set[str] = set(params)
+        self.parent = parent
+
+    def encloses(self, name: str) -> bool:
+        # Whether an enclosing function (not the top level) binds name
+        scope = self.parent
+        while scope is not None:
+            if name in scope.locals:
+                return True
+            scope = scope.parent
+        return False
+
+
+class Transpiler:
+    def __init__(self, builtins: Optional[Dict[str, Builtin]] = None):
+        self.builtins = BUILTINS if builtins is None else builtins
+        self.lines: List[str] = []
+        self.functions: Set[str] = set()
+        self.variables: Set[str] = set()
+        # Variables that only ever hold numbers; '+' on them needs no _add()
+        self.numeric: Set[str] = set()
+        self.temporaries = 0
+        # Where a lambda found in the current statement is defined
+        self.hoist: Tuple[int, Optional[FunctionScope]] = (0, None)
+
+    def transpile(self, statements) -> str:
+        self.lines = []
+        self.functions = set(self.declared_functions(statements))
+        self.variables = set(self.bound_names(statements))
+        self.numeric = self.numeric_variables(statements)
+        self.temporaries = 0
+        self.block(statements, 0, None)
+        return '\n'.join(self.lines) + '\n'
+
+    def temporary(self, prefix: str) -> str:
+        self.temporaries += 1
+        return f"_{prefix}_{self.temporaries}"
+
+    def emit(self, indent: int, text: str):
+        self.lines.append('    ' * indent + text)
+
+    def declared_functions(self, node):
+        if isinstance(node, dict):
+            if node.get('type') == 'function_declaration':
+                yield node['name']
+            for value in node.values():
+                yield from self.declared_functions(value)
+        elif isinstance(node, (list, tuple)):
+            for item in node:
+                yield from self.declared_functions(item)
+
+    def bound_names(self, node):
+        # Every variable name the program binds anywhere
+        if isinstance(node, dict):
+            node_type = node.get('type')
+            if node_type in ('var_declaration', 'assignment', 'import'):
+                yield node.get('alias', node.get('name'))
+            elif node_type == 'for':
+                yield node['iterator']
+            elif node_type == 'try_catch':
+                yield node['catch_var']
+            elif node_type in ('function_declaration', 'lambda'):
+                yield from (param['name'] for param in node['params'])
+            for value in node.values():
+                yield from self.bound_names(value)
+        elif isinstance(node, (list, tuple)):
+            for item in node:
+                yield from self.bound_names(item)
+
+    def bindings(self, node, found: Dict[str, List[Any]]):
+        # The value nodes assigned to each variable; None when the value is
+        # not an expression (parameters, caught errors, modules)
+        if isinstance(node, dict):
+            node_type = node.get('type')
+            if node_type in ('var_declaration', 'assignment'):
+                found.setdefault(node['name'], []).append(node['value'])
+            elif node_type == 'for':
+                iterable = node['iterable']
+                found.setdefault(node['iterator'], []).append(iterable if iterable.get('type') == 'range' else None)
+            elif node_type == 'try_catch':
+                found.setdefault(node['catch_var'], []).append(None)
+            elif node_type == 'import':
+                found.setdefault(node['alias'], []).append(None)
+            elif node_type in ('function_declaration', 'lambda'):
+                for param in node['params']:
+                    found.setdefault(param['name'], []).append(None)
+            for value in node.values():
+                self.bindings(value, found)
+        elif isinstance(node, (list, tuple)):
+            for item in node:
+                self.bindings(item, found)
+        return found
+
+    def declared_variables(self, node):
+        if isinstance(node, dict):
+            if node.get('type') == 'var_declaration':
+                yield node['name']
+            elif node.get('type') == 'for':
+                yield node['iterator']
+            for value in node.values():
+                yield from self.declared_variables(value)
+        elif isinstance(node, (list, tuple)):
+            for item in node:
+                yield from self.declared_variables(item)
+
+    def numeric_variables(self, statements) -> Set[str]:
+        # Starts from every declared variable (names only assigned could hold
+        # a run input) and drops those with a binding that may not be a
+        # number, until no more change
+        bindings = self.bindings(statements, {})
+        numeric = set(self.declared_variables(statements))
+        changed = True
+        while changed:
+            changed = False
+            for name in list(numeric):
+                if not all(self.is_numeric(value, numeric) for value in bindings[name]):
+                    numeric.discard(name)
+                    changed = True
+        return numeric
+
+    def is_numeric(self, node, numeric: Set[str]) -> bool:
+        if node is None:
+            return False
+        node_type = node.get('type')
+        if node_type == 'number' or node_type == 'range':
+            return True
+        if node_type == 'variable':
+            return node['name'] in numeric
+        if node_type == 'unary_op':
+            return self.is_numeric(node['operand'], numeric)
+        if node_type == 'binary_op':
+            operator = node['operator']
+            if operator in ('-', '/'):
+                return True  # Anything else raises a TypeError
+            if operator == '%':
+                return self.is_numeric(node['left'], numeric)
+            if operator in ('+', '*'):
+                return self.is_numeric(node['left'], numeric) and self.is_numeric(node['right'], numeric)
+        return False
+
+    def block(self, statements, indent: int, scope: Optional[FunctionScope]):
+        if not statements:
+            self.emit(indent, 'pass')
+        for statement in statements:
+            self.statement(statement, indent, scope)
+
+    def statement(self, node, indent: int, scope: Optional[FunctionScope]):
+        node_type = node.get('type')
+        self.hoist = (indent, scope)
+
+        if node_type in ('var_declaration', 'assignment'):
+            self.emit(indent, f"v_{node['name']} = {self.expression(node['value'])}")
+
+        elif node_type == 'index_assignment':
+            container = self.container(node['array'])
+            self.emit(indent, f"_rt.assign_index({container}, {self.expression(node['index'])}, "
+                              f"{self.expression(node['value'])})")
+
+        elif node_type == 'function_declaration':
+            self.function(node, indent)
+
+        elif node_type == 'return':
+            if scope is None:
+                raise TranspileError("'return' outside of a function")
+            self.emit(indent, f"return {self.expression(node['value'])}")
+
+        elif node_type == 'if':
+            self.emit(indent, f"if {self.expression(node['condition'])}:")
+            self.block(node['then'], indent + 1, scope)
+            if node['else']:
+                self.emit(indent, 'else:')
+                self.block(node['else'], indent + 1, scope)
+
+        elif node_type == 'while':
+            self.emit(indent, f"while {self.expression(node['condition'])}:")
+            self.block(node['body'], indent + 1, scope)
+
+        elif node_type == 'for':
+            iterable = node['iterable']
+            if iterable.get('type') == 'range':
+                source = self.expression(iterable)
+            else:
+                source = f"_rt.iteration_values({self.expression(iterable)})"
+            # Like the interpreter, restore (or unbind) the iterator afterwards
+            name = f"v_{node['iterator']}"
+            saved = self.temporary('outer')
+            self.emit(indent, f"{saved} = locals().get({name!r}, _MISSING)")
+            self.emit(indent, 'try:')
+            self.emit(indent + 1, f"for {name} in {source}:")
+            self.block(node['body'], indent + 2, scope)
+            self.emit(indent, 'finally:')
+            self.emit(indent + 1, f"if {saved} is not _MISSING:")
+            self.emit(indent + 2, f"{name} = {saved}")
+            self.emit(indent + 1, f"elif {name!r} in locals():")
+            self.emit(indent + 2, f"del {name}")
+
+        elif node_type == 'try_catch':
+            self.emit(indent, 'try:')
+            self.block(node['try_body'], indent + 1, scope)
+            self.emit(indent, 'except Exception as _error:')
+            # Like the interpreter, restore (or unbind) the catch variable
+            name = f"v_{node['catch_var']}"
+            saved = self.temporary('outer')
+            self.emit(indent + 1, f"{saved} = locals().get({name!r}, _MISSING)")
+            self.emit(indent + 1, f"{name} = _message(_error)")
+            self.emit(indent + 1, 'try:')
+            self.block(node['catch_body'], indent + 2, scope)
+            self.emit(indent + 1, 'finally:')
+            self.emit(indent + 2, f"if {saved} is not _MISSING:")
+            self.emit(indent + 3, f"{name} = {saved}")
+            self.emit(indent + 2, f"elif {name!r} in locals():")
+            self.emit(indent + 3, f"del {name}")
+
+        elif node_type == 'throw':
+            self.emit(indent, f"raise Exception(str({self.expression(node['value'])}))")
+
+        elif node_type == 'import':
+            # Imported modules run on the tree interpreter
+            self.emit(indent, f"v_{node['alias']} = _rt.import_module({node['path']!r})")
+
+        elif node_type == 'print':
+            args = ''.join(f"{self.expression(arg)}, " for arg in node['arguments'])
+            self.emit(indent, f"print({args}file=_rt.output)")
+
+        else:
+            self.emit(indent, self.expression(node))
+
+    def function(self, node, indent: int):
+        self.define(f"f_{node['name']}", node['params'], node['body'], indent, None)
+        self.emit(indent, f"_rt.functions[{node['name']!r}] = f_{node['name']}")
+
+    def define(self, python_name: str, params, body, indent: int, parent: Optional[FunctionScope]):
+        params = [param['name'] for param in params]
+        scope = FunctionScope(params, parent)
+        self.collect_locals(body, scope)
+
+        self.emit(indent, f"def {python_name}({', '.join('v_' + name for name in params)}):")
+        nested = sorted(set(self.declared_functions(body)))
+        if nested:
+            self.emit(indent + 1, 'global ' + ', '.join('f_' + name for name in nested))
+        # Top-level variables a function reassigns start out as local copies,
+        # matching the interpreter, where a callee's assignments are discarded
+        for name in sorted(self.assigned_names(body) - scope.locals):
+            if scope.encloses(name):
+                raise TranspileError(f"The py engine does not support lambdas that assign "
+                                     f"their enclosing function's variable '{name}'")
+            self.emit(indent + 1, f"v_{name} = _G['v_{name}']")
+        self.block(body, indent + 1, scope)
+
+    def collect_locals(self, statements, scope: FunctionScope):
+        for node in self.walk_statements(statements):
+            node_type = node.get('type')
+            if node_type == 'var_declaration':
+                scope.locals.add(node['name'])
+            elif node_type == 'for':
+                scope.locals.add(node['iterator'])
+            elif node_type == 'try_catch':
+                scope.locals.add(node['catch_var'])
+
+    def assigned_names(self, statements) -> Set[str]:
+        return {node['name'] for node in self.walk_statements(statements)
+                if node.get('type') == 'assignment'}
+
+    def walk_statements(self, statements):
+        # Statements of a function body, not descending into nested functions
+        for node in statements:
+            yield node
+            node_type = node.get('type')
+            if node_type == 'if':
+                yield from self.walk_statements(node['then'])
+                yield from self.walk_statements(node['else'])
+            elif node_type in ('while', 'for'):
+                yield from self.walk_statements(node['body'])
+            elif node_type == 'try_catch':
+                yield from self.walk_statements(node['try_body'])
+                yield from self.walk_statements(node['catch_body'])
+
+    def container(self, target) -> str:
+        if isinstance(target, str):
+            return f"v_{target}"
+        return self.expression(target)
+
+    def expression(self, node) -> str:
+        node_type = node.get('type')
+
+        if node_type == 'number':
+            return repr(node['value'])
+
+        elif node_type == 'string':
+            value = node['value']
+            if value.startswith('"') and value.endswith('"'):
+                value = value[1:-1]
+            return repr(value)
+
+        elif node_type == 'boolean':
+            return 'True' if node['value'] else 'False'
+
+        elif node_type == 'variable':
+            name = node['name']
+            if name in self.functions and name not in self.variables:
+                # A declared function used as a value
+                return f"_Function({name!r}, f_{name})"
+            return f"v_{name}"
+
+        elif node_type == 'binary_op':
+            template = BINARY_TEMPLATES.get(node['operator'])
+            if template is None:
+                raise TranspileError(f"Unsupported operator: {node['operator']}")
+            if node['operator'] == '+' and self.is_numeric(node, self.numeric):
+                template = '({} + {})'
+            return template.format(self.expression(node['left']), self.expression(node['right']))
+
+        elif node_type == 'unary_op':
+            return f"({node['operator']}{self.expression(node['operand'])})"
+
+        elif node_type == 'array_literal':
+            return '[' + ', '.join(self.expression(element) for element in node['elements']) + ']'
+
+        elif node_type == 'map_literal':
+            entries = []
+            for key, value in node['entries']:
+                key_source = self.expression(key)
+                if key.get('type') not in ('string', 'number', 'boolean'):
+                    key_source = f"_rt.map_key({key_source})"
+                entries.append(f"{key_source}: {self.expression(value)}")
+            return '{' + ', '.join(entries) + '}'
+
+        elif node_type == 'array_access':
+            return f"_rt.index_value({self.container(node['array'])}, {self.expression(node['index'])})"
+
+        elif node_type == 'array_slice':
+            start = self.expression(node['start']) if node['start'] is not None else 'None'
+            end = self.expression(node['end']) if node['end'] is not None else 'None'
+            return f"_rt.slice_value({self.container(node['array'])}, {start}, {end})"
+
+        elif node_type == 'range':
+            return f"_range({self.expression(node['start'])}, {self.expression(node['end'])})"
+
+        elif node_type == 'module_call':
+            args = ''.join(self.expression(arg) + ', ' for arg in node['arguments'])
+            return f"_rt.call_module(v_{node['module']}, {node['name']!r}, [{args}])"
+
+        elif node_type == 'module_access':
+            return f"_rt.module_variable(v_{node['module']}, {node['name']!r})"
+
+        elif node_type == 'lambda':
+            indent, scope = self.hoist
+            name = self.temporary('lambda')
+            self.define(name, node['params'], node['body'], indent, scope)
+            self.hoist = (indent, scope)
+            return f"_Function('<lambda>', {name})"
+
+        elif node_type == 'call_value':
+            args = ''.join(self.expression(arg) + ', ' for arg in node['arguments'])
+            return f"_call_value({self.expression(node['callee'])}, ({args}))"
+
+        elif node_type in ('inline_call', 'inline_builtin'):
+            # Calls are cheap in compiled code; use the original call
+            return self.expression(node['call'])
+
+        elif node_type == 'conditional':
+            otherwise = self.expression(node['else']) if node['else'] is not None else 'None'
+            return f"({self.expression(node['then'])} if {self.expression(node['condition'])} else {otherwise})"
+
+        elif node_type == 'function_call':
+            name = node['name']
+            args = [self.expression(arg) for arg in node['arguments']]
+            if name in self.functions:
+                return f"f_{name}({', '.join(args)})"
+            if name in self.builtins:
+                return f"b_{name}(_rt, ({''.join(arg + ', ' for arg in args)}))"
+            if name in self.variables:
+                # A variable holding a function value
+                return f"_call_value(v_{name}, ({''.join(arg + ', ' for arg in args)}))"
+            return f"_rt.lookup_function({name!r})({', '.join(args)})"
+
+        raise TranspileError(f"The py engine does not support '{node_type}' nodes")
+
+
+# Compiled code objects keyed by a hash of the AST and the builtin names
+_CODE_CACHE: Dict[str, Tuple[CodeType, str]] = {}
+
+
+def program_key(statements, builtins: Dict[str, Builtin]) -> str:
+    digest = hashlib.sha256(marshal.dumps(tuple(statements), KEY_MARSHAL_VERSION))
+    digest.update(' '.join(sorted(builtins)).encode('utf-8'))
+    digest.update(sys.implementation.cache_tag.encode('utf-8'))
+    return digest.hexdigest()
+
+
+def compile_statements(statements, builtins: Optional[Dict[str, Builtin]] = None,
+                       name: str = '<elton>', cache_dir: Optional[str] = None) -> Tuple[CodeType, str]:
+    builtins = BUILTINS if builtins is None else builtins
+    key = program_key(statements, builtins)
+    cached = _CODE_CACHE.get(key)
+    if cached is not None:
+        return cached
+
+    cache_path = os.path.join(cache_dir, f"{key}.eltc") if cache_dir else None
+    if cache_path and os.path.exists(cache_path):
+        with open(cache_path, 'rb') as f:
+            code, source = marshal.load(f)
+    else:
+        source = Transpiler(builtins).transpile(statements)
+        code = compile(source, name, 'exec')
+        if cache_path:
+            os.makedirs(cache_dir, exist_ok=True)
+            temporary = f"{cache_path}.{os.getpid()}"
+            with open(temporary, 'wb') as f:
+                marshal.dump((code, source), f)
+            os.replace(temporary, cache_path)
+
+    _CODE_CACHE[key] = (code, source)
+    return code, source
+
+
+def run_code(code: CodeType, inputs: Optional[Dict[str, Any]] = None,
+             builtins: Optional[Dict[str, Builtin]] = None, output=None,
+             source_path: Optional[str] = None) -> Dict[str, Any]:
+    runtime = PyRuntime(None, builtins)
+    runtime.output = output
+    runtime.source_path = source_path
+    namespace: Dict[str, Any] = {
+        '_rt': runtime,
+        '_add': _add,
+        '_div': _div,
+        '_range': _range,
+        '_message': _message,
+        '_call_value': _call_value,
+        '_Function': Function,
+        '_MISSING': _MISSING,
+    }
+    namespace['_G'] = namespace
+    for name, entry in runtime.builtins.items():
+        namespace[f"b_{name}"] = entry
+    for name, value in (inputs or {}).items():
+        namespace[f"v_{name}"] = value
+
+    try:
+        exec(code, namespace)
+    except NameError as e:
+        raise NameError(_message(e)) from e
+
+    return {name[2:]: value for name, value in namespace.items() if name.startswith('v_')}
@@ -0,0 +1,164 @@
+import weakref
+from typing import Any, Dict, List, Optional
+
+
+# Live views by id() of the list they read from. A view keeps its list alive,
+# so the id cannot be reused while an entry for it exists.
+LIVE_VIEWS: Dict[int, Dict[int, weakref.ref]] = {}
+
+
+def _watch(view, base: List[Any]):
+    key = id(base)
+    view_id = id(view)
+
+    def forget(ref):
+        views = LIVE_VIEWS.get(key)
+        if views is not None and views.get(view_id) is ref:
+            del views[view_id]
+            if not views:
+                del LIVE_VIEWS[key]
+
+    LIVE_VIEWS.setdefault(key, {})[view_id] = weakref.ref(view, forget)
+
+
+def detach_views(array: List[Any]):
+    # Called before a list is changed in place: views still reading from it
+    # take a private copy of their range first, so they keep the contents
+    # they had when the slice was taken
+    if not LIVE_VIEWS:
+        return
+    views = LIVE_VIEWS.pop(id(array), None)
+    if views:
+        for ref in list(views.values()):
+            view = ref()
+            if view is not None and view._base is array:
+                view._own()
+
+
+# A slice of an array that shares the parent's storage. Reads, iteration and
+# nested slicing never copy. A slice behaves like a copy all the same: the
+# first mutation of the view copies the viewed range into a private list, and
+# mutating the parent (see detach_views) does the same for its live views.
+class ArrayView:
+    __slots__ = ('_base', '_start', '_stop', '_owned', '__weakref__')
+
+    def __init__(self, base: List[Any], start: int, stop: int):
+        self._base = base
+        self._start = start
+        self._stop = stop
+        self._owned = False
+        _watch(self, base)
+
+    @classmethod
+    def of(cls, array, start, end):
+        # Resolves Python-style (clamped, negative-aware) slice bounds
+        if isinstance(array, ArrayView):
+            return array[start:end]
+        bounds = range(len(array))[start:end]
+        return cls(array, bounds.start, bounds.stop)
+
+    def _bounds(self):
+        if self._owned:
+            return 0, len(self._base)
+        # Lists changed outside the interpreter are not detached; never read
+        # past their end
+        stop = min(self._stop, len(self._base))
+        return min(self._start, stop), stop
+
+    def _own(self) -> List[Any]:
+        if self._owned:
+            detach_views(self._base)  # Slices taken from this view
+        else:
+            start, stop = self._bounds()
+            self._base = self._base[start:stop]
+            self._start, self._stop = 0, len(self._base)
+            self._owned = True
+        return self._base
+
+    def materialize(self) -> List[Any]:
+        start, stop = self._bounds()
+        return self._base[start:stop]
+
+    def __len__(self):
+        start, stop = self._bounds()
+        return stop - start
+
+    def __getitem__(self, index):
+        start, stop = self._bounds()
+        if isinstance(index, slice):
+            bounds = range(start, stop)[index]
+            if bounds.step != 1:
+                return self._base[start:stop][index]
+            return ArrayView(self._base, bounds.start, bounds.stop)
+        if index < 0:
+            index += stop - start
+        if index < 0 or index >= stop - start:
+            raise IndexError(f"Array index {index} out of bounds")
+        return self._base[start + index]
+
+    def __setitem__(self, index, value):
+        self._own()[index] = value
+
+    def __iter__(self):
+        start, stop = self._bounds()
+        return map(self._base.__getitem__, range(start, stop))
+
+    def __contains__(self, value):
+        return any(item == value for item in self)
+
+    def __eq__(self, other):
+        if isinstance(other, (list, ArrayView)):
+            return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+        return NotImplemented
+
+    def __add__(self, other):
+        if isinstance(other, (list, ArrayView)):
+            return self.materialize() + list(other)
+        return NotImplemented
+
+    def __radd__(self, other):
+        if isinstance(other, list):
+            return other + self.materialize()
+        return NotImplemented
+
+    def __repr__(self):
+        return repr(self.materialize())
+
+    __hash__ = None
+
+    # Mutating list operations copy the viewed range first
+    def append(self, value):
+        self._own().append(value)
+
+    def extend(self, values):
+        self._own().extend(values)
+
+    def insert(self, index, value):
+        self._own().insert(index, value)
+
+    def pop(self, index=-1):
+        return self._own().pop(index)
+
+
+ARRAY_TYPES = (list, ArrayView)
+
+
+# A function used as a value: a lambda, or a declared function referenced by
+# name. `definition` is the same {'params', 'body', 'return_type'} dict the
+# function table holds. Lambdas keep a reference to the variables of the scope
+# that created them and run on a copy of that scope; references to declared
+# functions have no closure and see their caller's variables, like a call by
+# name. Functions taken from a module (util.triple) belong to the module's
+# interpreter and always run there, like util.triple(x) does.
+class Function:
+    __slots__ = ('name', 'definition', 'closure', 'owner')
+
+    def __init__(self, name: str, definition: Dict[str, Any], closure: Optional[Dict[str, Any]] = None,
+                 owner=None):
+        self.name = name
+        self.definition = definition
+        self.closure = closure
+        self.owner = owner
+
+    def __repr__(self):
+        return f"<fn {self.name}>"
@@ -0,0 +1,55 @@
+import pytest
+
+from src.program import Program
+
+
+def run(source):
+    return Program.from_source(source).run()
+
+
+def test_push_insert_and_extend_mutate_in_place():
+    results = run('arg a = [1, 2]\narg same = push(a, 3)\ninsert(a, 0, 0)\ninsert(a, -1, 9)\n'
+                  'extend(a, [4, 5])\narg b = [1, 2]\nextend(b, b)')
+    assert results['a'] == [0, 1, 2, 9, 3, 4, 5]
+    assert results['same'] is results['a']
+    assert results['b'] == [1, 2, 1, 2]
+
+
+def test_extend_with_a_slice_of_itself():
+    results = run('arg a = [1, 2, 3]\narg s = a[1:]\nextend(a, s)\narg t = a[0:2]\nextend(t, t)')
+    assert results['a'] == [1, 2, 3, 2, 3]
+    assert list(results['s']) == [2, 3]
+    assert list(results['t']) == [1, 2, 1, 2]
+
+
+def test_pop_checks_its_bounds():
+    results = run('arg a = [1, 2, 3, 4]\narg last = pop(a)\narg first = pop(a, 0)\n'
+                  'arg from_end = pop(a, -1)')
+    assert (results['last'], results['first'], results['from_end']) == (4, 1, 3)
+    assert results['a'] == [2]
+    with pytest.raises(IndexError, match='Array index 2 out of bounds'):
+        run('arg a = [1, 2]\npop(a, 2)')
+    with pytest.raises(IndexError, match='Array index -3 out of bounds'):
+        run('arg a = [1, 2]\npop(a, -3)')
+    with pytest.raises(IndexError, match='Cannot pop from an empty array'):
+        run('arg a = []\npop(a)')
+
+
+def test_array_of_copies_arrays_and_maps():
+    results = run('arg rows = array_of(3, [0, 0])\nrows[0][1] = 5\n'
+                  'arg maps = array_of(2, {"n": 0})\nmaps[1]["n"] = 1\n'
+                  'arg zeros = array_of(3, 0)\narg none = array_of(0, 1)')
+    assert results['rows'] == [[0, 5], [0, 0], [0, 0]]
+    assert results['maps'] == [{'n': 0}, {'n': 1}]
+    assert results['zeros'] == [0, 0, 0]
+    assert results['none'] == []
+    with pytest.raises(ValueError, match='Array length must not be negative'):
+        run('arg a = array_of(-1, 0)')
+
+
+def test_set_updates_arrays_and_maps():
+    results = run('arg a = [1, 2]\nset(a, 1, 7)\narg m = {}\nset(m, "k", 1)')
+    assert results['a'] == [1, 7]
+    assert results['m'] == {'k': 1}
+    with pytest.raises(TypeError, match='must be an array or a map'):
+        run('set("text", 0, 1)')
@@ -0,0 +1,56 @@
+import os
+
+from src.batch import ScriptResult, collect_scripts, format_summary, run_batch, run_script
+
+
+def write(path, text):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text)
+    return str(path)
+
+
+def test_collect_scripts_expands_directories_and_manifests(tmp_path):
+    write(tmp_path / 'suite' / 'b.el', '')
+    write(tmp_path / 'suite' / 'a.el', '')
+    write(tmp_path / 'suite' / 'notes.txt', '')
+    write(tmp_path / 'suite' / 'deep' / 'c.el', '')
+    manifest = write(tmp_path / 'lists' / 'manifest.txt', '# smoke tests\n\n  ../extra.el  \n')
+    scripts = collect_scripts([str(tmp_path / 'suite'), 'loose.el'], manifest)
+    suite = str(tmp_path / 'suite')
+    assert scripts == [os.path.join(suite, 'a.el'), os.path.join(suite, 'b.el'),
+                       os.path.join(suite, 'deep', 'c.el'), 'loose.el',
+                       os.path.join(str(tmp_path / 'lists'), '../extra.el')]
+
+
+def test_run_script_captures_output_and_errors(tmp_path):
+    good = run_script(write(tmp_path / 'good.el', 'prtoc("hello")\n'))
+    assert good.ok and good.output == 'hello\n' and good.seconds >= 0
+    bad = run_script(write(tmp_path / 'bad.el', 'prtoc("before")\nnope()\n'))
+    assert not bad.ok
+    assert bad.output == 'before\n'
+    assert bad.error == "Runtime Error: Function 'nope' is not defined"
+    syntax = run_script(write(tmp_path / 'syntax.el', 'arg = \n'))
+    assert syntax.error.startswith('Syntax Error:')
+    missing = run_script(str(tmp_path / 'missing.el'))
+    assert missing.error == f"Error: Could not find file {tmp_path / 'missing.el'}"
+
+
+def test_run_batch_keeps_the_input_order(tmp_path):
+    paths = [write(tmp_path / f's{i}.el', f'prtoc({i} * 2)\n') for i in range(6)]
+    paths.append(str(tmp_path / 'missing.el'))
+    for workers in (1, 2):
+        results = run_batch(paths, workers=workers)
+        assert [result.path for result in results] == paths
+        assert [result.output for result in results[:6]] == [f'{i * 2.0}\n' for i in range(6)]
+        assert [result.ok for result in results] == [True] * 6 + [False]
+
+
+def test_format_summary():
+    results = [ScriptResult('a.el', '', None, 0.0015),
+               ScriptResult('b.el', '', 'Runtime Error: x', 0.5)]
+    assert format_summary(results, 0.25).splitlines() == [
+        'Script  Status  Time (ms)',
+        'a.el    ok            1.5',
+        'b.el    FAILED      500.0',
+        '2 scripts, 1 failed, 0.50s script time, 0.25s wall time',
+    ]
@@ -0,0 +1,74 @@
+import pytest
+
+from src.builtins import BUILTINS
+from src.interpreter import Interpreter
+from src.program import Program
+
+
+def call(name, *args):
+    return BUILTINS[name](Interpreter(), list(args))
+
+
+def test_unique_keeps_booleans_apart_from_numbers():
+    assert call('unique', [1, True, 0, False, 1, True]) == [1, True, 0, False]
+    assert [type(item) for item in call('unique', [1, True, 0, False])] == [int, bool, int, bool]
+    assert call('unique', [[1, True], [1, 1], [1, True]]) == [[1, True], [1, 1]]
+
+
+def test_set_operations_keep_the_order_of_the_first_array():
+    assert call('union', [3, 1, 3], [2, 1]) == [3, 1, 2]
+    assert call('intersection', [1, True, 2], [True]) == [True]
+    assert [type(item) for item in call('intersection', [1, True, 2], [True])] == [bool]
+    assert call('difference', [0, False, 2], [False]) == [0, 2]
+    assert call('intersection', [[1], {'a': 1}], [{'a': 1}]) == [{'a': 1}]
+
+
+def run(source):
+    return Program.from_source(source).run()
+
+
+def test_sort_orders_naturally_and_falls_back_to_text_for_mixed_types():
+    results = run('arg a = sort([3, 1, 2])\narg b = sort([3, 1, 2], true)\n'
+                  'arg c = sort(["b", "a", "c"])\narg d = sort([10, "9", 2])')
+    assert results['a'] == [1, 2, 3]
+    assert results['b'] == [3, 2, 1]
+    assert results['c'] == ['a', 'b', 'c']
+    assert results['d'] == [10, 2, '9']
+
+
+def test_sort_by_uses_a_key_function_by_name_or_value_and_is_stable():
+    results = run('fn size(s: string) int { return len(s) }\n'
+                  'arg words = ["ccc", "a", "bb", "d", "ee"]\n'
+                  'arg by_name = sort_by(words, "size")\n'
+                  'arg by_value = sort_by(words, lambda(s: string) { return len(s) }, true)')
+    assert results['by_name'] == ['a', 'd', 'bb', 'ee', 'ccc']
+    assert results['by_value'] == ['ccc', 'bb', 'ee', 'a', 'd']
+    with pytest.raises(TypeError, match='Sort keys must be comparable'):
+        run('arg bad = sort_by([1, "a"], lambda(x: int) { return x })')
+
+
+def test_top_k_returns_the_largest_elements_in_order():
+    results = run('fn negate(x: int) int { return 0 - x }\n'
+                  'arg a = top_k([5, 1, 9, 3, 7], 3)\n'
+                  'arg b = top_k([5, 1, 9, 3, 7], 2, "negate")\n'
+                  'arg c = top_k([2, 1], 5)\narg d = top_k([2, 1], 0)')
+    assert results['a'] == [9, 7, 5]
+    assert results['b'] == [1, 3]
+    assert results['c'] == [2, 1]
+    assert results['d'] == []
+
+
+def test_bisect_and_binary_search_on_sorted_arrays():
+    results = run('arg xs = [1, 3, 3, 5, 8]\n'
+                  'arg at = [bisect(xs, 0), bisect(xs, 3), bisect(xs, 4), bisect(xs, 9)]\n'
+                  'arg found = [binary_search(xs, 3), binary_search(xs, 8), binary_search(xs, 4), '
+                  'binary_search([], 1)]')
+    assert results['at'] == [0, 1, 3, 5]
+    assert results['found'] == [1, 4, -1, -1]
+
+
+def test_contains_and_index_of():
+    results = run('arg xs = [4, "a", [1, 2]]\n'
+                  'arg r = [contains(xs, "a"), contains(xs, [1, 2]), contains(xs, 5), '
+                  'index_of(xs, [1, 2]), index_of(xs, 9)]')
+    assert results['r'] == [True, True, False, 2, -1]
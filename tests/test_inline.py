@@ -0,0 +1,56 @@
+import asyncio
+import time
+
+from src.program import Program
+
+
+def test_helpers_calling_async_builtins_stay_calls():
+    program = Program.from_source('fn nap(t: float) { return sleep(t) }\nnap(0)')
+    assert program.statements[-1]['type'] == 'function_call'
+
+
+def test_inlined_calls_with_suspending_arguments_run_concurrently():
+    program = Program.from_source('fn twice(x: int) int { return x * 2 }\n'
+                                  'arg y = twice(len([sleep(0.2)]))')
+    assert program.statements[-1]['value']['type'] == 'inline_call'
+
+    async def run_all():
+        return await asyncio.gather(*(program.run_async() for _ in range(4)))
+
+    started = time.perf_counter()
+    results = asyncio.run(run_all())
+    assert time.perf_counter() - started < 0.6
+    assert [result['y'] for result in results] == [2, 2, 2, 2]
+
+
+SHADOWING = '''
+fn find(a: array, x: int) int { return 42 }
+fn keys(m: map) string { return "mine" }
+fn map(f: string, a: array) int { return 7 }
+fn double(x: int) int { return x * 2 }
+fn first(a: array) int { return find(a, 1) }
+arg results = [find([1], 1), keys({"a": 1}), map("double", [1]), first([1]), listcomp("double", [1, 2])]
+'''
+
+
+def test_declared_functions_shadow_builtins():
+    program = Program.from_source(SHADOWING)
+    expected = [42, 'mine', 7, 42, [2, 4]]
+    assert program.run()['results'] == expected
+    assert program.run(engine='py')['results'] == expected
+    assert asyncio.run(program.run_async())['results'] == expected
+
+
+def test_helpers_calling_module_functions_run_concurrently(tmp_path):
+    (tmp_path / 'slow.el').write_text('fn nap(t: float) { return sleep(t) }\n')
+    main = tmp_path / 'main.el'
+    main.write_text('import "slow.el"\nfn g(t: float) { return slow.nap(t) }\ng(0.2)\n')
+    program = Program.from_file(str(main))
+    assert program.statements[-1]['type'] == 'function_call'
+
+    async def run_all():
+        return await asyncio.gather(*(program.run_async() for _ in range(4)))
+
+    started = time.perf_counter()
+    asyncio.run(run_all())
+    assert time.perf_counter() - started < 0.6
@@ -0,0 +1,73 @@
+import io
+import json
+import sys
+
+import pytest
+
+from src.builtins import BUILTINS
+from src.io_builtins import IO_BUILTINS, with_io
+from src.program import Program
+
+
+def test_io_builtins_are_opt_in(tmp_path):
+    path = tmp_path / 'secret.txt'
+    path.write_text('s3cret')
+    source = f'arg text = read_file({str(path)!r})'.replace("'", '"')
+    assert not set(IO_BUILTINS) & set(BUILTINS)
+    with pytest.raises(NameError, match="Function 'read_file' is not defined"):
+        Program.from_source(source).run()
+    with pytest.raises(NameError):
+        Program.from_source(source).run(engine='py')
+    assert Program.from_source(source, with_io()).run()['text'] == 's3cret'
+
+
+def run(source, **paths):
+    # Paths are spliced into the source as string literals
+    for name, path in paths.items():
+        source = source.replace('{' + name + '}', json.dumps(str(path)))
+    return Program.from_source(source, with_io()).run()
+
+
+def test_read_file_and_lines(tmp_path):
+    path = tmp_path / 'data.txt'
+    path.write_text('first\r\nsecond\n\nlast')
+    results = run('arg text = read_file({path})\narg seen = []\n'
+                  'for line in lines({path}) {\n    push(seen, line)\n}', path=path)
+    assert results['text'] == 'first\nsecond\n\nlast'
+    assert results['seen'] == ['first', 'second', '', 'last']
+    with pytest.raises(FileNotFoundError):
+        run('arg it = lines({path})', path=tmp_path / 'missing.txt')
+
+
+def test_stdin_builtins(monkeypatch):
+    monkeypatch.setattr(sys, 'stdin', io.StringIO('a\nb\n'))
+    assert run('arg text = read_stdin()')['text'] == 'a\nb\n'
+    monkeypatch.setattr(sys, 'stdin', io.StringIO('a\nb\n'))
+    assert run('arg seen = []\nfor line in stdin_lines() {\n    push(seen, line)\n}')['seen'] == ['a', 'b']
+
+
+def test_mapped_files(tmp_path):
+    path = tmp_path / 'data.bin'
+    path.write_bytes('header;café;tail'.encode('utf-8'))
+    (tmp_path / 'empty.bin').write_bytes(b'')
+    results = run('arg m = mmap_open({path})\narg size = mmap_size(m)\n'
+                  'arg at = [mmap_find(m, ";"), mmap_find(m, ";", 7), mmap_find(m, "nope")]\n'
+                  'arg word = mmap_read(m, 7, 5)\narg past = mmap_read(m, 100, 5)\nmmap_close(m)\n'
+                  'arg e = mmap_open({empty})\narg empty_size = mmap_size(e)\nmmap_close(e)',
+                  path=path, empty=tmp_path / 'empty.bin')
+    assert results['size'] == 17
+    assert results['at'] == [6, 12, -1]
+    assert results['word'] == 'café'
+    assert results['past'] == ''
+    assert results['empty_size'] == 0
+
+
+def test_writers_truncate_or_append(tmp_path):
+    path = tmp_path / 'out.txt'
+    path.write_text('old\n')
+    run('arg w = open_writer({path})\nwrite(w, "n=")\nwrite_line(w, "3")\nclose(w)', path=path)
+    assert path.read_text() == 'n=3\n'
+    run('arg w = open_writer({path}, true)\nwrite_line(w, "more")\nclose(w)', path=path)
+    assert path.read_text() == 'n=3\nmore\n'
+    with pytest.raises(TypeError):
+        run('write("not a writer", "x")')
@@ -0,0 +1,28 @@
+import asyncio
+
+import pytest
+
+from src.limits import LimitExceeded, Limits
+from src.program import Program
+
+
+def test_repeat_checks_the_size_before_building_the_string():
+    program = Program.from_source('arg s = repeat("ab", 1000000000000)')
+    with pytest.raises(LimitExceeded, match='String size limit of 100 exceeded'):
+        program.run(limits=Limits(max_size=100))
+    assert Program.from_source('arg s = repeat("ab", 3)').run(limits=Limits(max_size=6))['s'] == 'ababab'
+
+
+def test_array_of_checks_the_length_before_building_the_array():
+    program = Program.from_source('arg a = array_of(1000000000000, [1, 2])')
+    with pytest.raises(LimitExceeded, match='Array size limit of 100 exceeded'):
+        program.run(limits=Limits(max_size=100))
+    with pytest.raises(LimitExceeded):
+        asyncio.run(program.run_async(limits=Limits(max_size=100)))
+
+
+def test_slices_grown_in_place_are_size_checked():
+    program = Program.from_source('arg a: array = [1, 2]\narg s: array = a[0:]\n'
+                                  'for i in 1..20 {\n    extend(s, s)\n}')
+    with pytest.raises(LimitExceeded, match='Array size limit of 1000 exceeded'):
+        program.run(limits=Limits(max_size=1000))
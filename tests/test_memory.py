@@ -0,0 +1,41 @@
+import io
+
+import elton
+from src.lexer import Lexer
+from src.memory import run_with_memory_report
+from src.parser import Parser
+
+SOURCE = '''fn build(n: int) array {
+    arg a: array = []
+    arg i: int = 0
+    while (i < n) {
+        a = push(a, "item " + i)
+        i = i + 1
+    }
+    return a
+}
+arg xs: array = build(20000)
+'''
+
+
+def test_retained_memory_is_charged_to_the_allocating_line():
+    statements = Parser(Lexer(SOURCE).tokenize()).parse()
+    report = io.StringIO()
+    interpreter = run_with_memory_report(statements, report_stream=report)
+    sites = {key: site.net_bytes for key, site in interpreter.sites.items()}
+    # The strings and the array's slots are made by the push line
+    assert sites[('build', 5)] > 1024 * 1024
+    # The loop and the counter keep nothing of their own
+    assert abs(sites[('build', 4)]) < 4096
+    assert abs(sites[('build', 6)]) < 4096
+    assert '-' not in report.getvalue().split('Site', 1)[1]
+
+
+def test_memory_report_keeps_one_line_helpers_as_calls(tmp_path, capsys):
+    script = tmp_path / 'main.el'
+    script.write_text('fn build(n: int) array { return [n, n + 1, n + 2, n + 3] }\n'
+                      'arg keep: array = []\n'
+                      'for i in 1..2000 {\n    push(keep, build(i))\n}\n')
+    elton.run_file(str(script), memory_report=True)
+    report = capsys.readouterr()
+    assert 'build line 1' in report.out + report.err
@@ -0,0 +1,76 @@
+import pytest
+
+from src.lexer import Lexer
+from src.parser import Parser
+from src.program import Program
+
+
+def shape(node):
+    # Fully parenthesized text of an expression tree
+    node_type = node['type']
+    if node_type == 'binary_op':
+        return f"({shape(node['left'])} {node['operator']} {shape(node['right'])})"
+    if node_type == 'unary_op':
+        return f"({node['operator']}{shape(node['operand'])})"
+    if node_type == 'variable':
+        return node['name']
+    if node_type == 'boolean':
+        return 'true' if node['value'] else 'false'
+    return str(int(node['value'])) if node_type == 'number' else node_type
+
+
+def parse_expression(source):
+    return Parser(Lexer(f"arg r = {source}").tokenize()).parse()[0]['value']
+
+
+def evaluate(source):
+    return Program.from_source(f"arg a = 1\narg b = 2\narg c = 3\narg r = {source}").run()['r']
+
+
+@pytest.mark.parametrize('source, expected', [
+    ('a == b + c', '(a == (b + c))'),
+    ('a + b * c', '(a + (b * c))'),
+    ('a * b + c', '((a * b) + c)'),
+    ('a < b == c > a', '((a < b) == (c > a))'),
+    ('false || true && false', '(false || (true && false))'),
+    ('a && b || c && a', '((a && b) || (c && a))'),
+    ('a + b < c * a', '((a + b) < (c * a))'),
+    ('(a + b) * c', '((a + b) * c)'),
+])
+def test_binary_operator_precedence(source, expected):
+    assert shape(parse_expression(source)) == expected
+
+
+@pytest.mark.parametrize('source, expected', [
+    ('10 - 2 - 3', '((10 - 2) - 3)'),
+    ('8 / 2 / 2', '((8 / 2) / 2)'),
+    ('9 % 5 % 3', '((9 % 5) % 3)'),
+    ('a == b == c', '((a == b) == c)'),
+])
+def test_operators_of_equal_precedence_associate_left(source, expected):
+    assert shape(parse_expression(source)) == expected
+
+
+@pytest.mark.parametrize('source, expected', [
+    ('-a * b', '((-a) * b)'),
+    ('a - -b', '(a - (-b))'),
+    ('-(a + b)', '(-(a + b))'),
+    ('--a', '(-(-a))'),
+])
+def test_unary_minus_binds_tighter_than_binary_operators(source, expected):
+    assert shape(parse_expression(source)) == expected
+
+
+@pytest.mark.parametrize('source, expected', [
+    ('a == b + c', False),
+    ('c == a + b', True),
+    ('false || true && false', False),
+    ('10 - 2 - 3', 5),
+    ('8 / 2 / 2', 2),
+    ('2 * 3 + 4 * 5', 26),
+    ('-a * b', -2),
+    ('a - -b', 3),
+    ('-(a + b) * c', -9),
+])
+def test_expressions_evaluate_with_precedence(source, expected):
+    assert evaluate(source) == expected
@@ -0,0 +1,60 @@
+import io
+
+from src.interpreter import Interpreter
+from src.lexer import Lexer
+from src.parser import Parser
+from src.program import Program
+from src.quicken import MAX_DEOPTS, WARMUP
+
+
+def parse(source):
+    return Parser(Lexer(source).tokenize()).parse()
+
+
+def binary_node(statements):
+    # The `x < y` comparison of the first while loop
+    return next(node for node in statements if node['type'] == 'while')['condition']
+
+
+def test_specializes_after_warmup():
+    statements = parse('arg i: int = 0\nwhile (i < 20) { i = i + 1 }')
+    interpreter = Interpreter()
+    interpreter.evaluate(statements)
+    node = binary_node(statements)
+    assert interpreter.quickener.quick[id(node)][:2] == (float, float)
+    assert interpreter.variables['i'] == 20
+
+
+def test_guard_failure_deoptimizes_and_keeps_results():
+    statements = parse('fn lt(a: int, b: int) bool { return a < b }\n'
+                       'arg n: array = []\n'
+                       f'for k in 1..{WARMUP + 2} {{ push(n, lt(k, 100)) }}\n'
+                       'arg s = lt("a", "b")\n')
+    interpreter = Interpreter()
+    interpreter.evaluate(statements)
+    assert interpreter.variables['s'] is True
+    assert interpreter.quickener.stats.deoptimized >= 1
+    body = statements[0]['body'][0]['value']
+    assert id(body) not in interpreter.quickener.quick
+
+
+def test_sites_that_keep_changing_types_stay_generic():
+    source = 'fn add(a: int, b: int) int { return a + b }\n'
+    for _ in range(MAX_DEOPTS + 1):
+        source += f'for k in 1..{WARMUP + 1} {{ add(k, 1) }}\narg s = add("a", "b")\n'
+    statements = parse(source)
+    interpreter = Interpreter()
+    interpreter.evaluate(statements)
+    node = statements[0]['body'][0]['value']
+    assert id(node) in interpreter.quickener.generic
+    assert interpreter.variables['s'] == 'ab'
+
+
+def test_profiles_stay_out_of_the_shared_ast():
+    program = Program.from_source('arg t = 0\nfor k in 1..50 { t = t + k }\nprtoc(t)')
+    before = repr(program.statements)
+    outputs = [io.StringIO(), io.StringIO()]
+    for output in outputs:
+        program.run(output=output)
+    assert repr(program.statements) == before
+    assert [output.getvalue() for output in outputs] == ['1275.0\n', '1275.0\n']
@@ -0,0 +1,53 @@
+import asyncio
+import io
+import os
+
+import pytest
+
+from src.limits import LimitExceeded, Limits
+from src.program import Program
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Sample scripts that check their own results with lib/check.el and throw on
+# a mismatch
+SELF_CHECKING = ['inline_test.el', 'maps_test.el', 'slices_test.el', 'modules_test.el', 'closures_test.el', 'scopes_test.el']
+
+
+def load(name):
+    return Program.from_file(os.path.join(ROOT, name))
+
+
+@pytest.mark.parametrize('name', SELF_CHECKING)
+def test_samples_agree_on_every_engine(name):
+    program = load(name)
+    outputs = []
+    for engine in ('tree', 'py'):
+        output = io.StringIO()
+        program.run(engine=engine, output=output)
+        outputs.append(output.getvalue())
+    assert outputs[0] and outputs[0] == outputs[1]
+
+
+@pytest.mark.parametrize('limits, message', [
+    (Limits(max_depth=20), 'Call depth limit of 20 exceeded'),
+    (Limits(max_steps=1000), 'Step limit of 1000 exceeded'),
+    (Limits(max_size=1000), 'Map size limit of 1000 exceeded'),
+    (Limits(max_size=3000), 'String size limit of 3000 exceeded'),
+    (Limits(max_size=4500), 'Array size limit of 4500 exceeded'),
+])
+def test_limits_sample_runs_out_of_budget(limits, message):
+    program = load('limits_test.el')
+    assert 'array 5000' in program_output(program)
+    output = io.StringIO()
+    with pytest.raises(LimitExceeded, match=message):
+        program.run(limits=limits, output=output)
+    assert 'caught' not in output.getvalue()
+    with pytest.raises(LimitExceeded, match=message):
+        asyncio.run(program.run_async(limits=limits))
+
+
+def program_output(program):
+    output = io.StringIO()
+    program.run(output=output)
+    return output.getvalue()
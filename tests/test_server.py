@@ -0,0 +1,69 @@
+import json
+import os
+import socket
+import tempfile
+import threading
+
+import pytest
+
+import eltonc
+from src.server import EltonServer
+
+
+@pytest.fixture
+def server():
+    # Unix socket paths are limited to about 100 bytes, so not under tmp_path
+    directory = tempfile.mkdtemp()
+    socket_path = os.path.join(directory, 'elton.sock')
+    server = EltonServer(socket_path)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield socket_path
+    server.shutdown()
+    server.server_close()
+    os.unlink(socket_path)
+    os.rmdir(directory)
+
+
+def request(socket_path, path, args=()):
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as connection:
+        connection.connect(socket_path)
+        connection.sendall(json.dumps({'path': str(path), 'args': list(args)}).encode('utf-8') + b'\n')
+        return [json.loads(line) for line in connection.makefile('rb')]
+
+
+def test_output_is_streamed_as_json_lines(server, tmp_path):
+    script = tmp_path / 'hello.el'
+    script.write_text('for a in argv {\n    prtoc("arg", a)\n}\n')
+    assert request(server, script, ['x', 'y']) == [{'out': 'arg x\n'}, {'out': 'arg y\n'}, {'exit': 0}]
+    assert request(server, script) == [{'exit': 0}]
+
+
+def test_errors_are_reported_after_the_output(server, tmp_path):
+    script = tmp_path / 'fails.el'
+    script.write_text('prtoc("start")\nnope()\n')
+    assert request(server, script) == [{'out': 'start\n'},
+                                       {'err': "Runtime Error: Function 'nope' is not defined"},
+                                       {'exit': 1}]
+    missing = tmp_path / 'missing.el'
+    assert request(server, missing) == [{'err': f"Error: Could not find file {missing}"}, {'exit': 1}]
+    broken = tmp_path / 'broken.el'
+    broken.write_text('arg = \n')
+    messages = request(server, broken)
+    assert messages[0]['err'].startswith('Syntax Error:')
+    assert messages[1:] == [{'exit': 1}]
+
+
+def test_edited_scripts_are_recompiled(server, tmp_path):
+    script = tmp_path / 'edit.el'
+    script.write_text('prtoc("one")\n')
+    assert request(server, script)[0] == {'out': 'one\n'}
+    script.write_text('prtoc("two", "!")\n')
+    assert request(server, script)[0] == {'out': 'two !\n'}
+
+
+def test_client_prints_the_stream(server, tmp_path, capsys):
+    script = tmp_path / 'client.el'
+    script.write_text('prtoc(len(argv))\nnope()\n')
+    assert eltonc.run(server, str(script), ['a', 'b']) == 1
+    assert capsys.readouterr().out == "2\nRuntime Error: Function 'nope' is not defined\n"
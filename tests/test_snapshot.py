@@ -0,0 +1,52 @@
+import io
+import os
+
+from src.program import Program
+
+
+def test_run_inputs_are_not_saved_or_restored(tmp_path):
+    program = Program.from_source('arg table: array = [1, 2, 3]\ncheckpoint()\narg total = table[2]')
+    path = str(tmp_path / 'prologue.snap')
+    first = program.run({'user_token': 'alice-secret'}, snapshot=path)
+    assert first['user_token'] == 'alice-secret'
+    second = program.run({}, snapshot=path)
+    assert 'user_token' not in second
+    assert second['total'] == 3
+    third = program.run({'user_token': 'bob'}, snapshot=path)
+    assert third['user_token'] == 'bob'
+
+
+def test_function_values_survive_a_restore(tmp_path):
+    (tmp_path / 'util.el').write_text('fn triple(x: int) int { return x * 3 }\n')
+    source = ('import "util.el"\n'
+              'fn sq(x: int) int { return x * x }\n'
+              'fn adder(n: int) { arg add = lambda(x: int) { return x + n }\n return add }\n'
+              'arg g = sq\n'
+              'arg add5 = adder(5)\n'
+              'arg t = util.triple\n'
+              'prtoc("prologue ran")\n'
+              'checkpoint()\n'
+              'arg results = [g(3), add5(1), t(2), map(util.triple, [1, 2])]\n')
+    main = tmp_path / 'main.el'
+    main.write_text(source)
+    program = Program.from_file(str(main))
+    path = str(tmp_path / 'prologue.snap')
+    expected = [9, 6, 6, [3, 6]]
+    assert program.run(snapshot=path)['results'] == expected
+    assert os.path.exists(path)
+    output = io.StringIO()
+    assert program.run(output=output, snapshot=path)['results'] == expected
+    assert output.getvalue() == ''
+
+
+def test_editing_an_imported_module_invalidates_the_snapshot(tmp_path):
+    util = tmp_path / 'util.el'
+    util.write_text('fn triple(x: int) int { return x * 3 }\n')
+    main = tmp_path / 'main.el'
+    main.write_text('import "util.el"\narg t = util.triple(2)\ncheckpoint()\narg u = util.triple(2)\n')
+    program = Program.from_file(str(main))
+    path = str(tmp_path / 'prologue.snap')
+    assert program.run(snapshot=path)['t'] == 6
+    util.write_text('fn triple(x: int) int { return x * 100 }\n')
+    results = program.run(snapshot=path)
+    assert (results['t'], results['u']) == (200, 200)
@@ -0,0 +1,50 @@
+import pytest
+
+from src.program import Program
+from src.string_builtins import PATTERN_CACHE_SIZE, _compile
+
+
+def run(source):
+    return Program.from_source(source).run()
+
+
+def test_split_find_replace_and_substring():
+    results = run('arg parts = [split("a b  c"), split("a,b,,c", ","), split("abc", ",")]\n'
+                  'arg found = [find("banana", "an"), find("banana", "an", 2), find("banana", "x")]\n'
+                  'arg replaced = [replace("banana", "a", "o"), replace("banana", "a", "o", 2)]\n'
+                  'arg subs = [substring("elton", 1, 3), substring("elton", 2), substring("elton", -3, -1)]')
+    assert results['parts'] == [['a', 'b', 'c'], ['a', 'b', '', 'c'], ['abc']]
+    assert results['found'] == [1, 3, -1]
+    assert results['replaced'] == ['bonono', 'bonona']
+    assert results['subs'] == ['lt', 'ton', 'to']
+
+
+def test_string_helpers_work_on_both_engines():
+    program = Program.from_source('arg r = [starts_with("elton", "el"), ends_with("elton", "on"), '
+                                  'trim("  x \\n"), repeat("ab", 3), len("héllo")]')
+    expected = [True, True, 'x', 'ababab', 5]
+    assert program.run()['r'] == expected
+    assert program.run(engine='py')['r'] == expected
+
+
+def test_match_and_find_all():
+    results = run('arg m = match("(\\\\w+)@(\\\\w+)", "mail ann@host now")\n'
+                  'arg none = match("^x", "abc")\n'
+                  'arg nums = find_all("[0-9]+", "a1 b22 c333")')
+    assert results['m'] == ['ann@host', 'ann', 'host']
+    assert results['none'] == []
+    assert results['nums'] == ['1', '22', '333']
+
+
+def test_patterns_are_compiled_once():
+    _compile.cache_clear()
+    run('arg n = 0\nfor i in 1..50 {\n    n = n + len(find_all("[a-z]+", "ab cd"))\n}')
+    info = _compile.cache_info()
+    assert info.misses == 1
+    assert info.hits == 49
+    assert info.maxsize == PATTERN_CACHE_SIZE
+
+
+def test_invalid_patterns_raise_value_errors():
+    with pytest.raises(ValueError, match="Invalid regular expression '\\('"):
+        run('arg m = match("(", "x")')
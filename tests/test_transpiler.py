@@ -0,0 +1,17 @@
+from src import transpiler
+from src.program import Program
+
+
+def test_programs_compile_once_for_the_py_engine(monkeypatch):
+    program = Program.from_source('fn double(x: int) int { return x * 2 }\narg y = double(4)')
+    calls = []
+    compile_statements = transpiler.compile_statements
+
+    def counting(*args, **kwargs):
+        calls.append(args)
+        return compile_statements(*args, **kwargs)
+
+    monkeypatch.setattr(transpiler, 'compile_statements', counting)
+    assert [program.run(engine='py')['y'] for _ in range(3)] == [8, 8, 8]
+    assert 'def f_double' in program.python_source()
+    assert len(calls) == 1